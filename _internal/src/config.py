@@ -4,10 +4,36 @@ Vulture - Configuration Manager
 Manages configuration settings for Vulture
 """
 
+import functools
 import json
 import os
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Parsed config files keyed by (path, mtime_ns, size) so repeat loads skip JSON parsing
+_CONFIG_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_config_path() -> Path:
+    """Default config file location, probed once per process."""
+    # Try Docker path first, then local
+    config_file = Path("/workspace/.vulture_config.json")
+    if not config_file.exists():
+        config_file = Path.home() / ".vulture_config.json"
+    return config_file
+
+
+@functools.lru_cache(maxsize=None)
+def _auto_detect_dir(docker_dir: str, local_dir: str) -> Path:
+    """Pick the Docker directory if it exists, otherwise the local one (probed once per process)."""
+    return Path(docker_dir) if Path(docker_dir).exists() else Path(local_dir)
 
 
 class Config:
@@ -25,38 +51,111 @@ class Config:
         'output_dir': None,  # Auto-detect
     }
     
-    def __init__(self, config_file: Optional[str] = None):
+    def __init__(self, config_file: Optional[str] = None, watch: bool = False):
+        """
+        Args:
+            config_file: Configuration file path (auto-detected if not specified)
+            watch: Reload the configuration when the file changes on disk
+                   (requires the optional watchdog package)
+        """
         if config_file is None:
-            # Try Docker path first, then local
-            self.config_file = Path("/workspace/.vulture_config.json")
-            if not self.config_file.exists():
-                self.config_file = Path.home() / ".vulture_config.json"
+            self.config_file = _resolve_config_path()
         else:
             self.config_file = Path(config_file)
         
-        self.config = self._load_config()
+        # Parsed lazily on first access via the `config` property
+        self._config: Optional[Dict[str, Any]] = None
+        # Resolved tools/mappings directories, keyed by config key
+        self._dir_cache: Dict[str, Path] = {}
+        
+        self._observer = None
+        if watch:
+            self._start_watching()
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Configuration values, loaded from file on first access."""
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
+    
+    def _start_watching(self):
+        """Drop the loaded config whenever the config file is modified or replaced."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            print("⚠ watchdog not installed, config changes will not be picked up automatically")
+            return
+        
+        if not self.config_file.parent.exists():
+            return
+        
+        config = self
+        
+        class _ConfigFileHandler(FileSystemEventHandler):
+            # Only content changes matter; open/close/access events leave the cache alone
+            def _invalidate(self, event, path):
+                if not event.is_directory and Path(path).name == config.config_file.name:
+                    # Reloaded from disk on next access
+                    config._config = None
+                    config._dir_cache.clear()
+            
+            def on_modified(self, event):
+                self._invalidate(event, event.src_path)
+            
+            def on_created(self, event):
+                self._invalidate(event, event.src_path)
+            
+            def on_moved(self, event):
+                # Editors often save by writing a temp file and renaming it over the config
+                self._invalidate(event, event.dest_path)
+        
+        self._observer = Observer()
+        self._observer.daemon = True
+        self._observer.schedule(_ConfigFileHandler(), str(self.config_file.parent), recursive=False)
+        self._observer.start()
+    
+    def close(self):
+        """Stop watching the config file."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file."""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    user_config = json.load(f)
-                    # Merge with defaults
-                    config = self.DEFAULT_CONFIG.copy()
-                    config.update(user_config)
-                    return config
-            except Exception as e:
-                print(f"⚠ Error loading config: {e}, using defaults")
-                return self.DEFAULT_CONFIG.copy()
-        else:
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return self.DEFAULT_CONFIG.copy()
+        
+        key = (str(self.config_file), st.st_mtime_ns, st.st_size)
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None:
+            return cached.copy()
+        
+        try:
+            data = self.config_file.read_bytes()
+            user_config = orjson.loads(data) if orjson else json.loads(data)
+            # Merge with defaults
+            config = self.DEFAULT_CONFIG.copy()
+            config.update(user_config)
+        except Exception as e:
+            print(f"⚠ Error loading config: {e}, using defaults")
             return self.DEFAULT_CONFIG.copy()
+        
+        _CONFIG_CACHE[key] = config
+        return config.copy()
     
     def save(self):
         """Save configuration to file."""
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        if orjson:
+            self.config_file.write_bytes(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.config_file, 'w') as f:
+                json.dump(self.config, f, indent=2)
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value."""
@@ -65,30 +164,30 @@ class Config:
     def set(self, key: str, value: Any):
         """Set configuration value."""
         self.config[key] = value
+        self._dir_cache.pop(key, None)
     
     def get_tools_dir(self) -> Path:
         """Get tools directory path."""
-        tools_dir = self.config.get('tools_dir')
-        if tools_dir:
-            return Path(tools_dir)
-        
-        # Auto-detect
-        tools_dir = Path("/workspace/tools")
-        if not tools_dir.exists():
-            tools_dir = Path("tools")
-        return tools_dir
+        return self._resolve_dir('tools_dir', "/workspace/tools", "tools")
     
     def get_mappings_dir(self) -> Path:
         """Get mappings directory path."""
-        mappings_dir = self.config.get('mappings_dir')
-        if mappings_dir:
-            return Path(mappings_dir)
+        return self._resolve_dir('mappings_dir', "/workspace/mappings", "mappings")
+    
+    def _resolve_dir(self, key: str, docker_dir: str, local_dir: str) -> Path:
+        """Resolve a directory from config or auto-detect it, caching the result."""
+        cached = self._dir_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        configured = self.config.get(key)
+        if configured:
+            resolved = Path(configured)
+        else:
+            resolved = _auto_detect_dir(docker_dir, local_dir)
         
-        # Auto-detect
-        mappings_dir = Path("/workspace/mappings")
-        if not mappings_dir.exists():
-            mappings_dir = Path("mappings")
-        return mappings_dir
+        self._dir_cache[key] = resolved
+        return resolved
 
 
 def main():
@@ -11,9 +11,93 @@ import zipfile
 import json
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-import re
+from typing import Dict, FrozenSet, Iterator, List, Optional, Set
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Bytes of a resource read at a time when scanning it for URLs
+RESOURCE_SCAN_CHUNK_SIZE = 64 * 1024
+
+# Overlap kept between chunks: one byte less than the longest scheme searched for (b'https://')
+URL_SCHEME_OVERLAP = len(b'https://') - 1
+
+# Resources larger than this (uncompressed) are not scanned for URLs
+RESOURCE_SCAN_SIZE_LIMIT = 4 * 1024 * 1024
+
+# Total uncompressed bytes of resources scanned for URLs per JAR
+RESOURCE_SCAN_TOTAL_BUDGET = 64 * 1024 * 1024
+
+# Resource count from which URL scanning is spread over a thread pool, and its size
+RESOURCE_SCAN_PARALLEL_THRESHOLD = 16
+RESOURCE_SCAN_WORKERS = min(8, os.cpu_count() or 2)
+
+# Keywords (first letter in either case) that put a class name into each category
+CLASS_CATEGORY_KEYWORDS = {
+    'gui_classes': ('gui', 'screen', 'button'),
+    'session_classes': ('session', 'auth', 'token'),
+    'network_classes': ('net', 'http', 'webhook', 'url'),
+    'data_classes': ('data', 'json', 'config'),
+    'main_classes': ('mod', 'main'),
+}
+
+# CLASS_CATEGORY_KEYWORDS with both spellings of every keyword, for plain substring tests
+_CATEGORY_VARIANTS = tuple(
+    (category, tuple(v for k in keywords for v in (k, k[0].upper() + k[1:])))
+    for category, keywords in CLASS_CATEGORY_KEYWORDS.items()
+)
+
+
+def _build_classifier():
+    """Generate a function returning a bitmask of the categories (bit i = _CATEGORY_VARIANTS[i]) a class name falls into."""
+    lines = ['def _classify(name):', '    bits = 0']
+    for i, (_, variants) in enumerate(_CATEGORY_VARIANTS):
+        lines.append(f"    if {' or '.join(f'{v!r} in name' for v in variants)}:")
+        lines.append(f'        bits |= {1 << i}')
+    lines.append('    return bits')
+    namespace: Dict = {}
+    exec('\n'.join(lines), namespace)
+    return namespace['_classify']
+
+
+# The keyword tests unrolled into straight-line code, built once at import
+_classify = _build_classifier()
+
+# main_classes matches almost every class (anything under a "...mod..." package), so only
+# this many are kept; the full count goes into 'main_class_count'
+REPORT_CAP = 8
+
+# Class-name substrings behind each security flag, with the message reported when one is found
+SECURITY_NAME_CHECKS = (
+    ('has_network_classes', ('Http', 'http', 'URL', 'Webhook', 'Network', 'Socket'), 'Network-related classes found'),
+    ('has_webhook_references', ('Webhook', 'webhook', 'Discord', 'discord'), 'Webhook references found'),
+    ('has_token_access', ('Token', 'token', 'Session', 'session'), 'Token/session access classes found'),
+    ('has_reflection', ('Reflect', 'reflect', 'Field', 'field', 'Method', 'method'), 'Reflection usage detected'),
+)
+
+
+def _entry_has_url(jar: zipfile.ZipFile, name: str) -> bool:
+    """Check a JAR entry for http:// or https:// without loading it whole (False if unreadable)."""
+    try:
+        with jar.open(name) as f:
+            tail = b''
+            while True:
+                chunk = f.read(RESOURCE_SCAN_CHUNK_SIZE)
+                if not chunk:
+                    return False
+                # Keep the end of the previous chunk so a URL scheme split across chunks is found
+                buf = tail + chunk
+                if b'http://' in buf or b'https://' in buf:
+                    return True
+                tail = buf[-URL_SCHEME_OVERLAP:]
+    except Exception:
+        return False
 
 
 class ModAnalyzer:
@@ -25,6 +109,10 @@ class ModAnalyzer:
             raise FileNotFoundError(f"JAR file not found: {jar_path}")
         
         self.jar = zipfile.ZipFile(self.jar_path, 'r')
+        # Entries, read once: ZipInfos and names for ordered scans, a set for membership tests
+        self._infos: List[zipfile.ZipInfo] = self.jar.infolist()
+        self._names: List[str] = [zi.filename for zi in self._infos]
+        self._name_set: FrozenSet[str] = frozenset(self._names)
         self.classes: List[str] = []
         self.resources: List[str] = []
         self.mod_info: Optional[Dict] = None
@@ -48,7 +136,7 @@ class ModAnalyzer:
         
         return {
             'mod_name': self.jar_path.name,
-            'file_count': len(self.jar.namelist()),
+            'file_count': len(self._names),
             'classes': class_analysis,
             'mod_info': self.mod_info,
             'security_flags': security_analysis,
@@ -57,38 +145,39 @@ class ModAnalyzer:
     
     def _extract_file_list(self):
         """Extract list of all files in the JAR."""
-        all_files = self.jar.namelist()
-        
-        for file_path in all_files:
-            if file_path.endswith('.class'):
+        for zi in self._infos:
+            if zi.is_dir():
+                continue
+            file_path = zi.filename
+            if file_path[-6:] == '.class':
                 self.classes.append(file_path)
-            elif not file_path.endswith('/'):
+            else:
                 self.resources.append(file_path)
         
-        print(f"Total files: {len(all_files)}")
+        print(f"Total files: {len(self._names)}")
         print(f"Class files: {len(self.classes)}")
         print(f"Resource files: {len(self.resources)}")
     
     def _find_mod_metadata(self):
         """Find mod metadata files."""
         # Check for mcmod.info
-        if 'mcmod.info' in self.jar.namelist():
+        if 'mcmod.info' in self._name_set:
             try:
-                info_content = self.jar.read('mcmod.info').decode('utf-8')
-                # Try to parse as JSON
+                info_content = self.jar.read('mcmod.info')
+                # Try to parse as JSON (straight from bytes)
                 try:
-                    self.mod_info = json.loads(info_content)
-                except:
+                    self.mod_info = orjson.loads(info_content) if orjson else json.loads(info_content)
+                except (ValueError, RecursionError):
                     # Might be in old format, try to extract info
-                    self.mod_info = {'raw': info_content}
+                    self.mod_info = {'raw': info_content.decode('utf-8')}
                 print("\n✓ Found mcmod.info")
             except Exception as e:
                 print(f"\n✗ Error reading mcmod.info: {e}")
         
         # Check for META-INF
-        meta_files = [f for f in self.jar.namelist() if f.startswith('META-INF/')]
-        if meta_files:
-            print(f"✓ Found {len(meta_files)} META-INF files")
+        meta_count = sum(1 for f in self._names if f.startswith('META-INF/'))
+        if meta_count:
+            print(f"✓ Found {meta_count} META-INF files")
     
     def _analyze_classes(self) -> Dict:
         """Analyze class files for interesting patterns."""
@@ -103,27 +192,30 @@ class ModAnalyzer:
             'main_classes': []
         }
         
-        # Patterns to look for
-        gui_pattern = re.compile(r'.*[Gg]ui.*|.*[Ss]creen.*|.*[Bb]utton.*')
-        session_pattern = re.compile(r'.*[Ss]ession.*|.*[Aa]uth.*|.*[Tt]oken.*')
-        network_pattern = re.compile(r'.*[Nn]et.*|.*[Hh]ttp.*|.*[Ww]ebhook.*|.*[Uu]rl.*')
-        data_pattern = re.compile(r'.*[Dd]ata.*|.*[Jj]son.*|.*[Cc]onfig.*')
-        main_pattern = re.compile(r'.*[Mm]od.*|.*[Mm]ain.*')
+        # (category bit, list it fills) in _CATEGORY_VARIANTS order, main_classes handled separately
+        buckets = tuple(
+            (1 << i, class_analysis[category])
+            for i, (category, _) in enumerate(_CATEGORY_VARIANTS)
+            if category != 'main_classes'
+        )
+        main_bit = 1 << [category for category, _ in _CATEGORY_VARIANTS].index('main_classes')
+        main_classes = class_analysis['main_classes']
+        main_count = 0
         
         for class_path in self.classes:
             class_name = class_path.replace('/', '.').replace('.class', '')
             
-            if gui_pattern.search(class_name):
-                class_analysis['gui_classes'].append(class_name)
-            if session_pattern.search(class_name):
-                class_analysis['session_classes'].append(class_name)
-            if network_pattern.search(class_name):
-                class_analysis['network_classes'].append(class_name)
-            if data_pattern.search(class_name):
-                class_analysis['data_classes'].append(class_name)
-            if main_pattern.search(class_name):
-                class_analysis['main_classes'].append(class_name)
+            bits = _classify(class_name)
+            if bits:
+                for bit, bucket in buckets:
+                    if bits & bit:
+                        bucket.append(class_name)
+                if bits & main_bit:
+                    main_count += 1
+                    if main_count <= REPORT_CAP:
+                        main_classes.append(class_name)
         
+        class_analysis['main_class_count'] = main_count
         return class_analysis
     
     def _security_analysis(self) -> Dict:
@@ -139,93 +231,141 @@ class ModAnalyzer:
             'suspicious_patterns': []
         }
         
+        # Patterns are reported once each, in the order they were first found
+        seen_patterns: Set[str] = set()
+        
+        def add_pattern(pattern: str):
+            if pattern not in seen_patterns:
+                seen_patterns.add(pattern)
+                flags['suspicious_patterns'].append(pattern)
+        
         # Check class names
         all_class_names = ' '.join(self.classes)
         
-        # Network patterns
-        if re.search(r'[Hh]ttp|URL|Webhook|Network|Socket', all_class_names):
-            flags['has_network_classes'] = True
-            flags['suspicious_patterns'].append('Network-related classes found')
+        for flag, keywords, message in SECURITY_NAME_CHECKS:
+            if any(keyword in all_class_names for keyword in keywords):
+                flags[flag] = True
+                add_pattern(message)
         
-        # Webhook patterns
-        if re.search(r'[Ww]ebhook|[Dd]iscord', all_class_names):
-            flags['has_webhook_references'] = True
-            flags['suspicious_patterns'].append('Webhook references found')
+        # Check resource files for URLs within the size budgets; the first hit settles the flag
+        candidates = []
+        oversized = 0
+        over_budget = 0
+        budget = RESOURCE_SCAN_TOTAL_BUDGET
+        for resource in self.resources:
+            if resource.endswith(('.json', '.txt')):
+                size = self.jar.getinfo(resource).file_size
+                if size > RESOURCE_SCAN_SIZE_LIMIT:
+                    oversized += 1
+                    continue
+                if size > budget:
+                    over_budget += 1
+                    continue
+                budget -= size
+                candidates.append(resource)
         
-        # Token patterns
-        if re.search(r'[Tt]oken|[Ss]ession', all_class_names):
-            flags['has_token_access'] = True
-            flags['suspicious_patterns'].append('Token/session access classes found')
+        for resource, has_url in zip(candidates, self._iter_resource_url_hits(candidates)):
+            if has_url:
+                flags['has_http_requests'] = True
+                add_pattern(f'URL found in {resource}')
+                break
+        else:
+            if oversized:
+                add_pattern(f'Resources over the scan size limit ({oversized} files not checked for URLs)')
+            if over_budget:
+                add_pattern(f'Resource scan budget exhausted ({over_budget} files not checked for URLs)')
         
-        # Reflection patterns
-        if re.search(r'[Rr]eflect|[Ff]ield|[Mm]ethod', all_class_names):
-            flags['has_reflection'] = True
-            flags['suspicious_patterns'].append('Reflection usage detected')
+        return flags
+    
+    def _iter_resource_url_hits(self, resources: List[str]) -> Iterator[bool]:
+        """
+        Yield, in order, whether each resource contains a URL.
         
-        # Check resource files for URLs
-        for resource in self.resources:
-            if resource.endswith('.json') or resource.endswith('.txt'):
-                try:
-                    content = self.jar.read(resource).decode('utf-8', errors='ignore')
-                    if re.search(r'https?://', content):
-                        flags['has_http_requests'] = True
-                        flags['suspicious_patterns'].append(f'URL found in {resource}')
-                except:
-                    pass
+        Many resources are scanned on a thread pool (zlib releases the GIL while inflating),
+        each worker with its own handle on the JAR; scans not yet started are cancelled
+        when the caller stops iterating.
+        """
+        if len(resources) < RESOURCE_SCAN_PARALLEL_THRESHOLD:
+            for resource in resources:
+                yield _entry_has_url(self.jar, resource)
+            return
         
-        return flags
+        local = threading.local()
+        opened: List[zipfile.ZipFile] = []
+        
+        def scan(resource: str) -> bool:
+            jar = getattr(local, 'jar', None)
+            if jar is None:
+                jar = local.jar = zipfile.ZipFile(self.jar_path, 'r')
+                opened.append(jar)
+            return _entry_has_url(jar, resource)
+        
+        executor = ThreadPoolExecutor(max_workers=RESOURCE_SCAN_WORKERS)
+        try:
+            yield from executor.map(scan, resources)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for jar in opened:
+                jar.close()
     
-    def print_report(self, analysis: Dict):
-        """Print a formatted analysis report."""
-        print("\n" + "=" * 60)
-        print("MOD ANALYSIS REPORT")
-        print("=" * 60)
+    def _format_report(self, analysis: Dict) -> str:
+        """Build the formatted analysis report."""
+        lines = []
+        lines.append("\n" + "=" * 60)
+        lines.append("MOD ANALYSIS REPORT")
+        lines.append("=" * 60)
         
-        print(f"\nMod File: {analysis['mod_name']}")
-        print(f"Total Files: {analysis['file_count']}")
+        lines.append(f"\nMod File: {analysis['mod_name']}")
+        lines.append(f"Total Files: {analysis['file_count']}")
         
         if analysis['mod_info']:
-            print("\nMod Information:")
+            lines.append("\nMod Information:")
             if isinstance(analysis['mod_info'], dict) and 'raw' not in analysis['mod_info']:
                 for key, value in analysis['mod_info'].items():
-                    print(f"  {key}: {value}")
+                    lines.append(f"  {key}: {value}")
             else:
-                print(f"  {analysis['mod_info']}")
+                lines.append(f"  {analysis['mod_info']}")
         
-        print("\nClass Analysis:")
+        lines.append("\nClass Analysis:")
         classes = analysis['classes']
-        print(f"  Total Classes: {classes['total']}")
-        print(f"  GUI Classes: {len(classes['gui_classes'])}")
+        lines.append(f"  Total Classes: {classes['total']}")
+        lines.append(f"  GUI Classes: {len(classes['gui_classes'])}")
         if classes['gui_classes']:
             for cls in classes['gui_classes'][:5]:
-                print(f"    - {cls}")
-        print(f"  Session/Auth Classes: {len(classes['session_classes'])}")
+                lines.append(f"    - {cls}")
+        lines.append(f"  Session/Auth Classes: {len(classes['session_classes'])}")
         if classes['session_classes']:
             for cls in classes['session_classes'][:5]:
-                print(f"    - {cls}")
-        print(f"  Network Classes: {len(classes['network_classes'])}")
+                lines.append(f"    - {cls}")
+        lines.append(f"  Network Classes: {len(classes['network_classes'])}")
         if classes['network_classes']:
             for cls in classes['network_classes'][:5]:
-                print(f"    - {cls}")
-        print(f"  Data Classes: {len(classes['data_classes'])}")
+                lines.append(f"    - {cls}")
+        lines.append(f"  Data Classes: {len(classes['data_classes'])}")
         if classes['data_classes']:
             for cls in classes['data_classes'][:5]:
-                print(f"    - {cls}")
+                lines.append(f"    - {cls}")
         
-        print("\nSecurity Analysis:")
+        lines.append("\nSecurity Analysis:")
         flags = analysis['security_flags']
-        print(f"  Network Classes: {'✓' if flags['has_network_classes'] else '✗'}")
-        print(f"  HTTP Requests: {'✓' if flags['has_http_requests'] else '✗'}")
-        print(f"  Webhook References: {'✓' if flags['has_webhook_references'] else '✗'}")
-        print(f"  Token Access: {'✓' if flags['has_token_access'] else '✗'}")
-        print(f"  Reflection Usage: {'✓' if flags['has_reflection'] else '✗'}")
+        lines.append(f"  Network Classes: {'✓' if flags['has_network_classes'] else '✗'}")
+        lines.append(f"  HTTP Requests: {'✓' if flags['has_http_requests'] else '✗'}")
+        lines.append(f"  Webhook References: {'✓' if flags['has_webhook_references'] else '✗'}")
+        lines.append(f"  Token Access: {'✓' if flags['has_token_access'] else '✗'}")
+        lines.append(f"  Reflection Usage: {'✓' if flags['has_reflection'] else '✗'}")
         
         if flags['suspicious_patterns']:
-            print("\n  Suspicious Patterns Detected:")
+            lines.append("\n  Suspicious Patterns Detected:")
             for pattern in flags['suspicious_patterns']:
-                print(f"    ⚠ {pattern}")
+                lines.append(f"    ⚠ {pattern}")
+        
+        lines.append("\n" + "=" * 60)
         
-        print("\n" + "=" * 60)
+        return '\n'.join(lines) + '\n'
+    
+    def print_report(self, analysis: Dict):
+        """Print a formatted analysis report (written to stdout in one call)."""
+        sys.stdout.write(self._format_report(analysis))
     
     def close(self):
         """Close the JAR file."""
@@ -4,22 +4,134 @@ Vulture - Minecraft Mod Compiler
 Compiles decompiled Java source code back into JAR files
 """
 
+import functools
 import subprocess
+import tempfile
 import zipfile
 import shutil
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+# Shared Nailgun server probe
+try:
+    from tool_manager import nailgun_running
+except ImportError:
+    # Handle case where running from different directory
+    sys.path.insert(0, str(Path(__file__).parent))
+    from tool_manager import nailgun_running
+
+
+# Source files per javac process before compilation is split across parallel processes
+PARALLEL_COMPILE_THRESHOLD = 500
+
+# Characters of javac stderr kept for error reporting
+JAVAC_STDERR_LIMIT = 1024
+
+# javac exit codes for a normal run (0: success, 1: compile errors); anything else from
+# a Nailgun run means the server or client failed, so the compile is retried with javac
+JAVAC_NORMAL_RETURNCODES = (0, 1)
+
+# Deflate level for newly written entries (level 1 is ~3x faster than the default 6)
+JAR_COMPRESSLEVEL = 1
+
+# Manifest written when neither the original JAR nor the caller provides one
+DEFAULT_MANIFEST = b"Manifest-Version: 1.0\n"
+
+# Buffer size for streaming entries from the original JAR
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Original JAR entries up to this size are staged in memory before being written; larger ones spill to disk
+ENTRY_SPOOL_SIZE = 8 * 1024 * 1024
+
+# JAR entry names always use '/', so only platforms with another separator need translating
+_NEEDS_SLASH_FIX = os.sep != '/'
+_SLASH_TABLE = str.maketrans('\\', '/')
+
+
+def _jar_dir_prefix(root: str, base: str) -> str:
+    """JAR entry prefix ('' or 'pkg/dir/') for files in directory root under base."""
+    rel_root = os.path.relpath(root, base)
+    if rel_root == '.':
+        return ''
+    if _NEEDS_SLASH_FIX:
+        rel_root = rel_root.translate(_SLASH_TABLE)
+    return rel_root + '/'
+
+
+def _quote_argfile_path(path: str) -> str:
+    """Quote a path for a javac @argfile (handles spaces and backslashes)."""
+    return '"' + path.replace('\\', '\\\\') + '"'
+
+
+# Command prefixes used to invoke javac
+_JAVAC_LAUNCHER = ("javac",)
+_NAILGUN_JAVAC_LAUNCHER = ("ng", "com.sun.tools.javac.Main")
+
+
+@functools.lru_cache(maxsize=None)
+def _javac_launcher(use_nailgun: bool = False) -> Tuple[str, ...]:
+    """
+    Command prefix used to invoke javac.
+    
+    With use_nailgun, a Nailgun client on PATH and a server answering, javac runs
+    inside that persistent JVM (no JVM startup or JIT warmup per compile). Otherwise
+    a plain javac process is spawned. The server must share this filesystem and
+    have the JDK compiler (com.sun.tools.javac) available.
+    """
+    if use_nailgun and nailgun_running():
+        return _NAILGUN_JAVAC_LAUNCHER
+    return _JAVAC_LAUNCHER
+
+
+def _copy_file(src: str, dst: Path):
+    """
+    Copy a file with metadata, keeping the data transfer inside the kernel.
+    
+    Uses copy_file_range where available (a reflink on btrfs/xfs, in-kernel copy
+    elsewhere) and falls back to shutil.copy2, which uses sendfile on Linux.
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return
+        except OSError:
+            # e.g. EXDEV across filesystems on some kernels
+            pass
+    shutil.copy2(src, dst)
+
+
+def _copy_zipinfo(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """Copy an entry's name, timestamp, compression method and attributes for re-writing."""
+    copy = zipfile.ZipInfo(info.filename, info.date_time)
+    copy.compress_type = info.compress_type
+    copy._compresslevel = JAR_COMPRESSLEVEL  # ZipFile.open(..., 'w') only reads the level from the ZipInfo
+    copy.external_attr = info.external_attr
+    copy.comment = info.comment
+    # Expected size lets ZipFile.open decide up front whether the entry needs zip64
+    copy.file_size = info.file_size
+    return copy
 
 
 class ModCompiler:
     """Compiles Java source code back into JAR files."""
     
-    def __init__(self, source_dir: str, output_jar: str):
+    def __init__(self, source_dir: str, output_jar: str, use_nailgun: bool = False):
         self.source_dir = Path(source_dir)
         self.output_jar = Path(output_jar)
         self.classes_dir = None
+        # Opt-in: run javac in a running Nailgun server (falls back to javac if it fails)
+        self.use_nailgun = use_nailgun
         
         if not self.source_dir.exists():
             raise FileNotFoundError(f"Source directory not found: {source_dir}")
@@ -44,14 +156,21 @@ class ModCompiler:
         
         # Build classpath - include original JAR if provided
         if original_jar and Path(original_jar).exists():
+            # Absolute, so it also resolves inside a Nailgun server with a different cwd
+            original_jar_path = os.path.abspath(original_jar)
             if classpath:
-                classpath = f"{original_jar}:{classpath}"
+                classpath = f"{original_jar_path}:{classpath}"
             else:
-                classpath = original_jar
+                classpath = original_jar_path
             print(f"Using original JAR as classpath: {Path(original_jar).name}")
         
         # Find all Java files
-        java_files = list(self.source_dir.rglob("*.java"))
+        java_files = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(os.path.abspath(self.source_dir))
+            for name in names
+            if name.endswith('.java')
+        ]
         
         if not java_files:
             print("✗ No Java files found to compile")
@@ -61,7 +180,7 @@ class ModCompiler:
         
         # Build javac command (use Java 17 for modern features)
         javac_cmd = [
-            "javac",
+            *_javac_launcher(self.use_nailgun),
             "-d", str(self.classes_dir),
             "-source", "17",
             "-target", "17",
@@ -72,24 +191,21 @@ class ModCompiler:
         if classpath:
             javac_cmd.extend(["-cp", classpath])
         
-        # Add all Java files
-        javac_cmd.extend([str(f) for f in java_files])
-        
-        # Compile - use batch compilation with error tolerance
-        # javac will compile what it can even if some files have errors
-        result = subprocess.run(
-            javac_cmd,
-            capture_output=True,
-            text=True,
-            cwd=self.source_dir
-        )
+        # Split large source trees across parallel javac processes
+        bucket_count = min(os.cpu_count() or 1, len(java_files) // PARALLEL_COMPILE_THRESHOLD)
+        if bucket_count > 1:
+            returncode, stderr = self._compile_buckets(javac_cmd, java_files, bucket_count)
+        else:
+            # Compile - use batch compilation with error tolerance
+            # javac will compile what it can even if some files have errors
+            returncode, stderr = self._run_javac(javac_cmd, java_files, "sources")
         
         # Count compiled classes (javac may compile some files even if others fail)
         class_files = list(self.classes_dir.rglob("*.class"))
         
         if len(class_files) > 0:
             # Some classes compiled successfully
-            if result.returncode != 0:
+            if returncode != 0:
                 print(f"⚠ Compilation completed with some errors")
                 print(f"   (Compiled {len(class_files)} classes despite errors)")
             else:
@@ -98,10 +214,87 @@ class ModCompiler:
         else:
             # No classes compiled at all
             print(f"✗ Compilation failed - no classes were compiled")
-            if result.stderr:
-                print(f"   Error: {result.stderr[:300]}")
+            if stderr:
+                print(f"   Error: {stderr[:300]}")
             return False
     
+    def _compile_buckets(self, javac_cmd: List[str], java_files: List[str], bucket_count: int) -> Tuple[int, str]:
+        """
+        Compile sources in parallel javac processes, one per bucket of files.
+        
+        Buckets are contiguous slices of the directory-ordered file list, so each
+        process mostly sees whole packages. Sources from other buckets are resolved
+        through -sourcepath without emitting class files for them.
+        
+        Returns:
+            Tuple of (highest return code, combined stderr)
+        """
+        print(f"Compiling in {bucket_count} parallel javac processes...")
+        
+        bucket_cmd = javac_cmd + [
+            "-sourcepath", str(self.source_dir.resolve()),
+            "-implicit:none",
+            "-Xprefer:source"
+        ]
+        bucket_size = -(-len(java_files) // bucket_count)
+        buckets = [java_files[i:i + bucket_size] for i in range(0, len(java_files), bucket_size)]
+        
+        def run_bucket(index: int) -> Tuple[int, str]:
+            return self._run_javac(bucket_cmd, buckets[index], f"sources_{index}")
+        
+        with ThreadPoolExecutor(max_workers=len(buckets)) as executor:
+            results = list(executor.map(run_bucket, range(len(buckets))))
+        
+        return max(code for code, _ in results), ''.join(err for _, err in results)
+    
+    def _run_javac(self, javac_cmd: List[str], sources: List[str], argfile_name: str) -> Tuple[int, str]:
+        """
+        Run javac on the given sources, passing them via an @argfile instead of argv.
+        
+        Only the first JAVAC_STDERR_LIMIT characters of stderr are kept; the pipe is
+        closed after that so a flood of compiler errors is never buffered in memory.
+        
+        If javac_cmd goes through Nailgun and the client cannot be started or exits
+        abnormally, the same compile is rerun with a plain javac process.
+        
+        Returns:
+            Tuple of (return code, truncated stderr)
+        """
+        argfile = self.classes_dir.parent / f"{self.classes_dir.name}_{argfile_name}.txt"
+        argfile.write_text('\n'.join(_quote_argfile_path(f) for f in sources), encoding='utf-8')
+        try:
+            launcher_len = len(_NAILGUN_JAVAC_LAUNCHER)
+            if tuple(javac_cmd[:launcher_len]) == _NAILGUN_JAVAC_LAUNCHER:
+                try:
+                    returncode, stderr = self._spawn_javac(javac_cmd, argfile)
+                    if returncode in JAVAC_NORMAL_RETURNCODES:
+                        return returncode, stderr
+                    reason = f"exited with code {returncode}"
+                except OSError as e:
+                    reason = str(e)
+                print(f"⚠ Nailgun javac failed ({reason}), retrying with javac")
+                javac_cmd = [*_JAVAC_LAUNCHER, *javac_cmd[launcher_len:]]
+            return self._spawn_javac(javac_cmd, argfile)
+        finally:
+            argfile.unlink()
+    
+    def _spawn_javac(self, javac_cmd: List[str], argfile: Path) -> Tuple[int, str]:
+        """Run javac_cmd with the given @argfile. Returns (return code, truncated stderr)."""
+        proc = subprocess.Popen(
+            javac_cmd + [f"@{argfile}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors='replace',
+            cwd=self.source_dir
+        )
+        try:
+            stderr = proc.stderr.read(JAVAC_STDERR_LIMIT)
+        finally:
+            # Further writes fail on javac's side instead of filling the pipe
+            proc.stderr.close()
+        return proc.wait(), stderr
+    
     def create_jar(self, manifest_file: Optional[str] = None, original_jar: Optional[str] = None) -> bool:
         """
         Create JAR file from compiled classes, merging with original JAR if provided.
@@ -110,18 +303,28 @@ class ModCompiler:
             manifest_file: Optional MANIFEST.MF file
             original_jar: Path to original JAR (will copy all non-recompiled content)
         """
-        # Check if we have any classes to package
-        class_files = []
+        # Check if we have any classes to package, collecting them in one walk as
+        # parallel arrays of file path and JAR entry path
+        class_paths: List[str] = []
+        class_jar_paths: List[str] = []
         if self.classes_dir and self.classes_dir.exists():
-            class_files = list(self.classes_dir.rglob("*.class"))
+            classes_root = str(self.classes_dir)
+            for root, _, names in os.walk(classes_root):
+                # Convert package structure to JAR path format (once per directory)
+                prefix = _jar_dir_prefix(root, classes_root)
+                for name in names:
+                    if name.endswith('.class'):
+                        class_paths.append(os.path.join(root, name))
+                        class_jar_paths.append(prefix + name)
         
         # If no classes compiled but we have original JAR, we can still create a JAR
         # by copying everything from original (this ensures size matches)
-        if len(class_files) == 0:
+        if len(class_paths) == 0:
             if original_jar and Path(original_jar).exists():
                 print("⚠ No classes compiled, copying original JAR as-is")
                 # Just copy the original JAR
-                shutil.copy2(original_jar, self.output_jar)
+                self.output_jar.parent.mkdir(parents=True, exist_ok=True)
+                _copy_file(original_jar, self.output_jar)
                 print(f"✓ Copied original JAR: {self.output_jar}")
                 print(f"  Size: {self.output_jar.stat().st_size / 1024:.1f} KB")
                 return True
@@ -130,7 +333,7 @@ class ModCompiler:
                 return False
         
         print(f"\nCreating JAR file: {self.output_jar}")
-        print(f"  Packaging {len(class_files)} newly compiled class file(s)...")
+        print(f"  Packaging {len(class_paths)} newly compiled class file(s)...")
         
         # Ensure output directory exists
         self.output_jar.parent.mkdir(parents=True, exist_ok=True)
@@ -141,81 +344,73 @@ class ModCompiler:
         
         try:
             # Get set of recompiled class paths (to know what to replace)
-            # Convert package structure to JAR path format
-            recompiled_classes = set()
-            for class_file in class_files:
-                rel_path = class_file.relative_to(self.classes_dir)
-                jar_path = str(rel_path).replace('\\', '/')
-                recompiled_classes.add(jar_path)
+            recompiled_classes = set(class_jar_paths)
             
-            # Also create a mapping from simple class name to full path for better matching
-            recompiled_class_names = {}
-            for class_file in class_files:
-                rel_path = class_file.relative_to(self.classes_dir)
-                jar_path = str(rel_path).replace('\\', '/')
-                class_name = class_file.stem
-                recompiled_class_names[class_name] = jar_path
+            # Names written to the output JAR, for O(1) "already in JAR" checks
+            written = set()
             
-            with zipfile.ZipFile(self.output_jar, 'w', zipfile.ZIP_DEFLATED) as jar:
+            with zipfile.ZipFile(self.output_jar, 'w', zipfile.ZIP_DEFLATED, compresslevel=JAR_COMPRESSLEVEL) as jar:
                 # If original JAR provided, copy everything from it first
                 if original_jar and Path(original_jar).exists():
                     print(f"  Merging with original JAR: {Path(original_jar).name}")
                     with zipfile.ZipFile(original_jar, 'r') as original:
-                        original_files = original.namelist()
                         copied_count = 0
                         skipped_count = 0
                         
-                        for file_info in original_files:
-                            # Skip classes that we recompiled (we'll add our versions)
-                            should_skip = False
-                            if file_info.endswith('.class') and len(class_files) > 0:
-                                # Check if exact path matches
-                                if file_info in recompiled_classes:
-                                    should_skip = True
-                                else:
-                                    # Check if class name matches in same package
-                                    class_name = Path(file_info).stem
-                                    if class_name in recompiled_class_names:
-                                        original_pkg = '/'.join(file_info.split('/')[:-1])
-                                        recompiled_pkg = '/'.join(recompiled_class_names[class_name].split('/')[:-1])
-                                        if original_pkg == recompiled_pkg:
-                                            should_skip = True
-                            
-                            if should_skip:
+                        for original_info in original.infolist():
+                            file_info = original_info.filename
+                            # Skip classes that we recompiled (we'll add our versions).
+                            # Same class name in the same package is the same JAR path,
+                            # so an exact path lookup covers it.
+                            if file_info in recompiled_classes:
                                 skipped_count += 1
                                 continue
                             
-                            # Copy everything else from original JAR
-                            try:
-                                data = original.read(file_info)
-                                jar.writestr(file_info, data)
-                                copied_count += 1
-                            except Exception as e:
-                                # Skip files that can't be read
-                                pass
+                            # Copy everything else from original JAR, keeping each entry's
+                            # compression method (stored entries stay stored) and timestamp.
+                            # The entry is read in full (and its CRC checked) before its output
+                            # entry is opened, so a read failure never leaves a partial entry.
+                            with tempfile.SpooledTemporaryFile(max_size=ENTRY_SPOOL_SIZE) as staged:
+                                try:
+                                    with original.open(original_info) as src:
+                                        shutil.copyfileobj(src, staged, COPY_BUFFER_SIZE)
+                                except Exception as e:
+                                    # Skip files that can't be read
+                                    continue
+                                staged.seek(0)
+                                with jar.open(_copy_zipinfo(original_info), 'w') as dst:
+                                    shutil.copyfileobj(staged, dst, COPY_BUFFER_SIZE)
+                            written.add(file_info)
+                            copied_count += 1
                         
                         print(f"  Copied {copied_count} files from original JAR")
                         if skipped_count > 0:
                             print(f"  Will replace {skipped_count} classes with recompiled versions")
                 
                 # Add all newly compiled class files (these override originals if they exist)
-                if len(class_files) > 0:
-                    for class_file in class_files:
-                        rel_path = class_file.relative_to(self.classes_dir)
-                        jar_path = str(rel_path).replace('\\', '/')
-                        jar.write(class_file, jar_path)
+                if len(class_paths) > 0:
+                    for class_path, jar_path in zip(class_paths, class_jar_paths):
+                        jar.write(class_path, jar_path)
+                        written.add(jar_path)
                 
                 # Add resources from source directory if not already in JAR
                 if not original_jar:
                     resource_count = 0
-                    for resource_file in self.source_dir.rglob("*"):
-                        if resource_file.is_file() and not resource_file.suffix == ".java":
-                            rel_path = resource_file.relative_to(self.source_dir)
-                            jar_path = str(rel_path).replace('\\', '/')
+                    source_root = str(self.source_dir)
+                    for root, _, names in os.walk(source_root):
+                        prefix = None
+                        for name in names:
+                            # Decompiled trees are mostly .java - skip them before any other work
+                            if name.endswith('.java'):
+                                continue
+                            if prefix is None:
+                                prefix = _jar_dir_prefix(root, source_root)
+                            jar_path = prefix + name
                             # Only add if not already in JAR
-                            if jar_path not in [f.filename for f in jar.filelist]:
+                            if jar_path not in written:
                                 try:
-                                    jar.write(resource_file, jar_path)
+                                    jar.write(os.path.join(root, name), jar_path)
+                                    written.add(jar_path)
                                     resource_count += 1
                                 except:
                                     pass
@@ -224,14 +419,17 @@ class ModCompiler:
                         print(f"  Added {resource_count} resource file(s) from source")
                 
                 # Ensure manifest exists
-                if "META-INF/MANIFEST.MF" not in [f.filename for f in jar.filelist]:
+                if "META-INF/MANIFEST.MF" not in written:
                     if manifest_file and Path(manifest_file).exists():
                         jar.write(manifest_file, "META-INF/MANIFEST.MF")
                     else:
-                        manifest_content = "Manifest-Version: 1.0\n"
-                        jar.writestr("META-INF/MANIFEST.MF", manifest_content)
+                        # Tiny and fixed: store it uncompressed with a deterministic timestamp
+                        manifest_info = zipfile.ZipInfo("META-INF/MANIFEST.MF", date_time=(1980, 1, 1, 0, 0, 0))
+                        manifest_info.compress_type = zipfile.ZIP_STORED
+                        jar.writestr(manifest_info, DEFAULT_MANIFEST)
+                    written.add("META-INF/MANIFEST.MF")
             
-            final_class_count = len([f for f in zipfile.ZipFile(self.output_jar, 'r').namelist() if f.endswith('.class')])
+            final_class_count = sum(1 for name in written if name.endswith('.class'))
             print(f"✓ Created JAR: {self.output_jar}")
             print(f"  Size: {self.output_jar.stat().st_size / 1024:.1f} KB")
             print(f"  Total classes: {final_class_count}")
@@ -252,17 +450,20 @@ class ModCompiler:
 def main():
     """Main function."""
     if len(sys.argv) < 3:
-        print("Usage: python mod_compiler.py <source_directory> <output_jar> [classpath] [--original-jar <jar>]")
+        print("Usage: python mod_compiler.py <source_directory> <output_jar> [classpath] [--original-jar <jar>] [--nailgun]")
         print("\nExample:")
         print("  python mod_compiler.py decompiled/my_mod my_mod_recompiled.jar")
         print("  python mod_compiler.py decompiled/my_mod my_mod_recompiled.jar -cp libs/*")
         print("  python mod_compiler.py decompiled/my_mod my_mod_recompiled.jar --original-jar original.jar")
+        print("\nOptions:")
+        print("  --nailgun    Run javac in a running Nailgun server (falls back to javac)")
         sys.exit(1)
     
     source_dir = sys.argv[1]
     output_jar = sys.argv[2]
     classpath = None
     original_jar = None
+    use_nailgun = False
     
     # Parse arguments
     i = 3
@@ -273,12 +474,15 @@ def main():
         elif sys.argv[i] == "-cp" and i + 1 < len(sys.argv):
             classpath = sys.argv[i + 1]
             i += 2
+        elif sys.argv[i] == "--nailgun":
+            use_nailgun = True
+            i += 1
         else:
             classpath = sys.argv[i]  # Assume it's classpath if no flag
             i += 1
     
     try:
-        compiler = ModCompiler(source_dir, output_jar)
+        compiler = ModCompiler(source_dir, output_jar, use_nailgun=use_nailgun)
         
         # Try to compile (may fail, but that's okay if we have original JAR)
         compilation_success = compiler.compile(classpath, original_jar)
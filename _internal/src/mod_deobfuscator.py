@@ -10,28 +10,576 @@ This tool:
 """
 
 import zipfile
+import functools
 import subprocess
 import json
 import re
 import os
 import sys
 import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import requests
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import tool manager and version detector
 try:
-    from tool_manager import ToolManager, MappingsDownloader
+    from tool_manager import ToolManager, get_cached_mappings, nailgun_main_class, nailgun_running
     from version_detector import VersionDetector
 except ImportError:
     # Handle case where running from different directory
     sys.path.insert(0, str(Path(__file__).parent))
-    from tool_manager import ToolManager, MappingsDownloader
+    from tool_manager import ToolManager, get_cached_mappings, nailgun_main_class, nailgun_running
     from version_detector import VersionDetector
 
 
+# Identifier tokens in Java source, with the context that decides how they are remapped:
+# a preceding class/extends/implements/new keyword, a following '(' (call) or a
+# following identifier (type of a variable, field or parameter). Matched on raw bytes:
+# obfuscated identifiers are ASCII, so files are never decoded or re-encoded.
+# The name alternative is generated from the loaded mappings (see _remap_tables), so
+# only identifiers that have a mapping ever reach Python code.
+_JAVA_TOKEN_PATTERN = (
+    rb'\b(?:(?P<kw>class|extends|implements|new)\s+)?(?P<name>%s)\b'
+    rb'(?:(?P<call>(?=\s*\())|(?P<type>(?=\s+\w)))?'
+)
+_JAVA_KEYWORDS = (b'class', b'extends', b'implements', b'new')
+# Mapping keys usable as tokens: identifiers, optionally dotted (com.foo.a) or nested (a$b)
+_IDENTIFIER_RE = re.compile(rb'\w+(?:[.$]\w+)*')
+
+# SRG records, matched per record type with findall so the per-line loop runs in the
+# regex engine. Each pattern starts at a newline (the text is prefixed with one), which
+# lets the engine jump between line starts instead of trying every offset as ^ does.
+# Trailing fields are ignored; anything else (comments, PK: lines) does not match.
+# CL: obf mapped
+_SRG_CLASS_RE = re.compile(r'\n[ \t]*CL:[ \t]+(\S+)[ \t]+(\S+)')
+# MD: obf_class obf_method obf_desc mapped_class mapped_method mapped_desc
+_SRG_METHOD_RE = re.compile(r'\n[ \t]*MD:[ \t]+(\S+)[ \t]+(\S+)[ \t]+\S+[ \t]+(\S+)[ \t]+(\S+)')
+# FD: obf_class/obf_field mapped_class/mapped_field
+_SRG_FIELD_RE = re.compile(r'\n[ \t]*FD:[ \t]+(\S+)[ \t]+(\S+)')
+
+# Analysis patterns that are plain text once backslash escapes are removed
+_PLAIN_PATTERN_RE = re.compile(r'(?:[^\\.^$*+?{}\[\]|()]|\\\W)*')
+_UNESCAPE_RE = re.compile(r'\\(\W)')
+
+# Java files per run before remapping/analysis is spread across worker processes
+PARALLEL_FILE_THRESHOLD = 200
+
+# Files handed to a worker process at a time
+PARALLEL_CHUNKSIZE = 16
+
+# Files are scanned for ANALYSIS_PATTERNS in line-aligned pieces of about this size
+ANALYSIS_CHUNK_SIZE = 1024 * 1024
+
+# Parsed SRG tables are cached next to the SRG file with this suffix; bump the version
+# whenever the parser's output or the cache layout changes
+MAPPINGS_CACHE_SUFFIX = ".cache.json"
+MAPPINGS_CACHE_VERSION = 2
+
+# Characters of decompiler/SpecialSource stderr kept for error reporting
+TOOL_STDERR_LIMIT = 500
+
+# Per-process state of pool workers, set once by the pool initializer
+_worker_remap_tables = None
+
+# Regex patterns searched for (case-insensitively) in deobfuscated code, per category.
+# Matches must not span lines: files are scanned in pieces cut at line breaks.
+ANALYSIS_PATTERNS = {
+    'webhook_references': [
+        r'webhook',
+        r'discord\.com/api/webhooks',
+        r'https?://.*webhook'
+    ],
+    'token_access': [
+        r'\.getToken\(\)',
+        r'\.getSession\(\)',
+        r'accessToken',
+        r'sessionToken'
+    ],
+    'network_code': [
+        r'HttpURLConnection',
+        r'URLConnection',
+        r'\.openConnection\(\)',
+        r'URL\(.*http'
+    ],
+    'session_access': [
+        r'Minecraft\.getMinecraft\(\)\.getSession\(\)',
+        r'Session\.class',
+        r'net\.minecraft\.util\.Session'
+    ],
+    'discord_references': [
+        r'discord',
+        r'Discord'
+    ]
+}
+
+
+def _required_literal(pattern: str) -> Optional[bytes]:
+    """
+    Longest lowercased text every match of a regex pattern must contain, or None.
+    
+    Only simple patterns are analysed (no groups, classes or alternation); a quantifier
+    drops the character before it from the required text. Runs shorter than 3
+    characters are not worth a prefilter.
+    """
+    runs = ['']
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char in '|([':
+            return None
+        if char == '\\' and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isalnum():
+                runs.append('')  # Class escape such as \d or \s
+            else:
+                runs[-1] += escaped
+            continue
+        if char in '?*+{':
+            # Repeated or optional: the character before it ends the required run
+            runs[-1] = runs[-1][:-1]
+            runs.append('')
+            if char == '{':
+                i = pattern.find('}', i)
+                if i < 0:
+                    return None
+        elif char in '.^$':
+            runs.append('')
+        else:
+            runs[-1] += char
+        i += 1
+    longest = max(runs, key=len)
+    return longest.lower().encode() if len(longest) >= 3 else None
+
+
+def _trie_pattern(words: List[bytes]) -> bytes:
+    """
+    Regex alternation matching exactly the given words, factored into a prefix trie.
+    
+    re tries the branches of a flat alternation one after another, so a few thousand
+    obfuscated names would be retried at every identifier. Nested by shared prefix,
+    each byte of input narrows the candidates instead.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[None] = True  # Word ends here
+    
+    def emit(node) -> bytes:
+        is_end = None in node
+        leaves = []
+        branches = []
+        for char in sorted(c for c in node if c is not None):
+            child = node[char]
+            escaped = re.escape(bytes([char]))
+            if len(child) == 1 and None in child:
+                leaves.append(escaped)
+            else:
+                branches.append(escaped + emit(child))
+        if leaves:
+            branches.append(leaves[0] if len(leaves) == 1 else b'[' + b''.join(leaves) + b']')
+        if not branches:
+            return b''
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        group = b'(?:' + b'|'.join(branches) + b')'
+        return group + b'?' if is_end else group
+    
+    return emit(trie)
+
+
+def _parse_srg(srg_file: str) -> Dict[str, Dict[str, str]]:
+    """Parse an SRG file into class, method and field tables."""
+    text = '\n' + Path(srg_file).read_text()
+    
+    # Method mappings, keyed "obf_class.obf_method" -> "mapped_class.mapped_method"
+    rows = _SRG_METHOD_RE.findall(text)
+    keys = map('.'.join, map(itemgetter(0, 1), rows))
+    values = map('.'.join, map(itemgetter(2, 3), rows))
+    
+    return {
+        'classes': dict(_SRG_CLASS_RE.findall(text)),
+        'methods': dict(zip(keys, values)),
+        'fields': dict(_SRG_FIELD_RE.findall(text))
+    }
+
+
+def _mappings_cache_path(mappings_file: str) -> Path:
+    """Location of the parsed-mappings cache for a mappings file."""
+    return Path(mappings_file + MAPPINGS_CACHE_SUFFIX)
+
+
+def _mappings_source_stamp(mappings_file: str) -> List[int]:
+    """[size, mtime_ns] of mappings_file, recorded in its cache to detect any change."""
+    st = os.stat(mappings_file)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _load_mappings_cache(mappings_file: str, source: List[int]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Parsed tables cached for mappings_file, or None if there is no usable cache.
+    
+    The cache is only used if it was written from a file with exactly the given
+    size and mtime (see _mappings_source_stamp). Unreadable, truncated or foreign
+    JSON is treated as a cache miss.
+    """
+    try:
+        data = _mappings_cache_path(mappings_file).read_bytes()
+        cached = orjson.loads(data) if orjson else json.loads(data)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict):
+        return None
+    if cached.get('version') != MAPPINGS_CACHE_VERSION or cached.get('source') != source:
+        return None
+    tables = cached.get('mappings')
+    if not isinstance(tables, dict) or not all(isinstance(tables.get(kind), dict) for kind in ('classes', 'methods', 'fields')):
+        return None
+    return tables
+
+
+def _save_mappings_cache(mappings_file: str, source: List[int], tables: Dict[str, Dict[str, str]]):
+    """Cache tables parsed from mappings_file as it was at source (skipped if the directory is read-only)."""
+    cached = {'version': MAPPINGS_CACHE_VERSION, 'source': source, 'mappings': tables}
+    try:
+        if orjson:
+            _mappings_cache_path(mappings_file).write_bytes(orjson.dumps(cached))
+        else:
+            _mappings_cache_path(mappings_file).write_text(json.dumps(cached, separators=(',', ':')))
+    except OSError:
+        pass
+
+
+def _run_tool(cmd: List[str], timeout: int) -> Tuple[int, str]:
+    """
+    Run an external tool, discarding stdout and keeping only the start of stderr.
+    
+    The stderr pipe is closed after TOOL_STDERR_LIMIT characters, so a decompiler that
+    prints megabytes of warnings is never buffered in memory.
+    
+    Returns:
+        Tuple of (return code, truncated stderr)
+    
+    Raises:
+        subprocess.TimeoutExpired: If the tool ran longer than timeout seconds (it is killed)
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors='replace'
+    )
+    timed_out = threading.Event()
+    
+    def kill():
+        timed_out.set()
+        proc.kill()
+    
+    # Reading stderr blocks, so the timeout is enforced by killing the process
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        try:
+            stderr = proc.stderr.read(TOOL_STDERR_LIMIT)
+        finally:
+            # Further writes fail on the tool's side instead of filling the pipe
+            proc.stderr.close()
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return returncode, stderr
+
+
+def _java_jar_command(jar: Path, use_nailgun: bool = False) -> List[str]:
+    """
+    Command prefix that runs an executable tool JAR.
+    
+    With use_nailgun and a Nailgun server answering, the JAR's Main-Class runs inside
+    that persistent JVM, so a batch of mods pays JVM startup and JIT warmup once instead
+    of per decompile/remap (see tool_manager.nailgun_main_class for when it falls back).
+    Otherwise a plain `java -jar` process is spawned. The server has its own working
+    directory, so callers pass absolute paths as arguments.
+    """
+    if use_nailgun and nailgun_running():
+        main_class = nailgun_main_class(str(jar.resolve()))
+        if main_class:
+            return ["ng", main_class]
+    return ["java", "-jar", str(jar)]
+
+
+def _iter_java_files(root: str) -> Iterator[str]:
+    """
+    Yield paths of .java files under root, directory by directory.
+    
+    Same order as os.walk (top-down, directories not followed through symlinks,
+    unreadable ones skipped), but straight from os.scandir entries without building
+    per-directory name lists.
+    """
+    stack = [root]
+    while stack:
+        subdirs = []
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith('.java'):
+                        yield entry.path
+        except OSError:
+            continue
+        # Reversed so the first subdirectory is walked next
+        stack.extend(reversed(subdirs))
+
+
+def _remap_tables(mappings: Dict[str, Dict[str, str]]) -> Tuple[Optional[re.Pattern], Dict[bytes, bytes], Dict[bytes, bytes]]:
+    """
+    Build the token regex and byte-keyed class/method tables used by _remap_java_source.
+    
+    Classes map to just their simple name (last part after package), as that is what
+    gets substituted into the source. Method mappings are matched by bare method name
+    (simplified - full implementation is complex); the first mapping for a name wins.
+    The token regex only matches names present in either table (None if there are none).
+    """
+    class_names = {
+        obf.encode(): mapped.rsplit('.', 1)[-1].encode()
+        for obf, mapped in mappings['classes'].items()
+    }
+    method_names = {}
+    for obf_key, mapped_key in mappings['methods'].items():
+        method_names.setdefault(obf_key.split('.', 1)[1].encode(), mapped_key.split('.', 1)[1].encode())
+    
+    # Only (possibly qualified) identifiers can appear as tokens; keywords that introduce
+    # a class reference are never names themselves. The trie tries longer names first,
+    # so a dotted key such as "a.b" wins over a separately mapped "a".
+    names = [
+        name for name in set(class_names).union(method_names)
+        if _IDENTIFIER_RE.fullmatch(name) and name not in _JAVA_KEYWORDS
+    ]
+    token_re = re.compile(_JAVA_TOKEN_PATTERN % _trie_pattern(names)) if names else None
+    return token_re, class_names, method_names
+
+
+def _remap_java_source(content: bytes, token_re: Optional[re.Pattern], class_names: Dict[bytes, bytes], method_names: Dict[bytes, bytes]) -> bytes:
+    """
+    Apply class and method mappings to Java source in a single regex substitution.
+    
+    Each mapped identifier is looked up once in the mapping tables, depending on its context.
+    Class references: "class a", "extends a", "implements a", "new a(", "a varName"
+    Method calls: "a(" (may have false positives)
+    """
+    if token_re is None:
+        return content
+    
+    def remap_token(match):
+        kw, name, call, type_usage = match.group('kw', 'name', 'call', 'type')
+        
+        replacement = class_names.get(name)
+        if replacement is None or not (
+            (kw is None and type_usage is not None)
+            or kw in (b'class', b'extends', b'implements')
+            or (kw == b'new' and call is not None)
+        ):
+            replacement = method_names.get(name) if call is not None else None
+        
+        if replacement is None:
+            return match.group(0)
+        # Keep the keyword and whitespace in front of the name
+        return replacement if kw is None else match.group(0)[:-len(name)] + replacement
+    
+    return token_re.sub(remap_token, content)
+
+
+def _remap_java_file(java_file: str, output_file: str, token_re: Optional[re.Pattern], class_names: Dict[bytes, bytes], method_names: Dict[bytes, bytes]) -> bool:
+    """Remap one Java file into output_file (its directory must exist). Returns True if anything was renamed."""
+    content = Path(java_file).read_bytes()
+    # Files that contain no mapped identifier cost one regex scan: token_re only matches
+    # mapped names, and re.sub hands back the input object unchanged when nothing matched
+    remapped = _remap_java_source(content, token_re, class_names, method_names)
+    
+    # Write deobfuscated file
+    Path(output_file).write_bytes(remapped)
+    
+    return remapped != content
+
+
+def _init_remap_worker(token_re: Optional[re.Pattern], class_names: Dict[bytes, bytes], method_names: Dict[bytes, bytes]):
+    """Pool initializer: receive the mapping tables once per worker process."""
+    global _worker_remap_tables
+    _worker_remap_tables = (token_re, class_names, method_names)
+
+
+def _remap_java_file_in_worker(paths: Tuple[str, str]) -> bool:
+    """Pool task: remap one (java_file, output_file) pair with the worker's tables."""
+    return _remap_java_file(paths[0], paths[1], *_worker_remap_tables)
+
+
+def _iter_line_chunks(path: str) -> Iterator[bytes]:
+    """
+    Yield a file's bytes in pieces of about ANALYSIS_CHUNK_SIZE that end at line breaks.
+    
+    Files smaller than ANALYSIS_CHUNK_SIZE come out in one piece. A line longer than
+    that is kept whole, so a match within a line is never split.
+    """
+    pending = []
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(ANALYSIS_CHUNK_SIZE)
+            if len(block) < ANALYSIS_CHUNK_SIZE:
+                pending.append(block)
+                break
+            cut = block.rfind(b'\n') + 1
+            if cut == 0:
+                pending.append(block)
+            else:
+                pending.append(block[:cut])
+                yield b''.join(pending)
+                pending = [block[cut:]]
+    tail = b''.join(pending)
+    if tail:
+        yield tail
+
+
+def _build_pattern_scanner(patterns: Dict[str, List[str]]):
+    """
+    Build a function mapping a Java file path to {category: first matching pattern}.
+    
+    Uses one Hyperscan database for all patterns when hyperscan is installed, otherwise
+    one compiled re alternation per category. Unreadable files yield no findings.
+    """
+    if hyperscan is not None:
+        # (category, index of the pattern in its category's list) per Hyperscan id
+        pattern_ids = [
+            (category, index)
+            for category, pattern_list in patterns.items()
+            for index in range(len(pattern_list))
+        ]
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[patterns[category][index].encode() for category, index in pattern_ids],
+            ids=list(range(len(pattern_ids))),
+            elements=len(pattern_ids),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(pattern_ids)
+        )
+        
+        def scan_hyperscan(java_file: str) -> Dict[str, str]:
+            # Matches arrive in order of where they end in the file, so keep the
+            # earliest-listed pattern per category, like the re scanner reports
+            best = {}
+            
+            def on_match(pattern_id, start, end, flags, context):
+                category, index = pattern_ids[pattern_id]
+                if index < best.get(category, len(patterns[category])):
+                    best[category] = index
+                # Stop scanning once every category has matched its first pattern
+                return len(best) == len(patterns) and not any(best.values())
+            
+            try:
+                db.scan(Path(java_file).read_bytes(), match_event_handler=on_match)
+            except hyperscan.ScanTerminated:
+                pass
+            except Exception:
+                return {}
+            # Only report once per file per category
+            return {category: patterns[category][best[category]] for category in patterns if category in best}
+        
+        return scan_hyperscan
+    
+    # Plain-text patterns (most of them) are checked with substring search on the
+    # lowercased file, which is far cheaper than a case-insensitive regex. The rest get
+    # one alternation per category; each is its own group so the match reports which
+    # one hit (patterns must not add groups). The alternation only runs on files that
+    # contain text one of its patterns requires, if every pattern has such text.
+    compiled = []
+    for category, pattern_list in patterns.items():
+        literals = []
+        regex_patterns = []
+        for pattern in pattern_list:
+            if _PLAIN_PATTERN_RE.fullmatch(pattern):
+                literals.append((_UNESCAPE_RE.sub(r'\1', pattern).lower().encode(), pattern))
+            else:
+                regex_patterns.append(pattern)
+        regex = None
+        prefilter = None
+        if regex_patterns:
+            regex = re.compile('|'.join(f'({p})' for p in regex_patterns).encode(), re.IGNORECASE)
+            required = [_required_literal(p) for p in regex_patterns]
+            if None not in required:
+                prefilter = required
+        compiled.append((category, literals, regex, regex_patterns, prefilter))
+    
+    def scan_re(java_file: str) -> Dict[str, str]:
+        # Scanned as raw bytes (the patterns are ASCII, so there is nothing to decode),
+        # piece by piece so a huge file is never held in memory whole. Per category the
+        # earliest-listed literal found anywhere wins, else the first regex match.
+        literal_hits = {}  # category -> index into its literals
+        regex_hits = {}
+        try:
+            for content in _iter_line_chunks(java_file):
+                lowered = content.lower()
+                for category, literals, regex, regex_patterns, prefilter in compiled:
+                    # Only literals listed before the best one found so far can still win
+                    for index in range(literal_hits.get(category, len(literals))):
+                        if literals[index][0] in lowered:
+                            literal_hits[category] = index
+                            break
+                    if category in literal_hits or category in regex_hits or regex is None:
+                        continue
+                    if prefilter and not any(text in lowered for text in prefilter):
+                        continue
+                    match = regex.search(content)
+                    if match:
+                        regex_hits[category] = regex_patterns[match.lastindex - 1]
+        except Exception:
+            return {}
+        
+        # Only report once per file per category
+        hits = {}
+        for category, literals, _, _, _ in compiled:
+            if category in literal_hits:
+                hits[category] = literals[literal_hits[category]][1]
+            elif category in regex_hits:
+                hits[category] = regex_hits[category]
+        return hits
+    
+    return scan_re
+
+
+@functools.lru_cache(maxsize=None)
+def _analysis_scanner():
+    """Scanner for ANALYSIS_PATTERNS, compiled on first use and shared by every analysis."""
+    return _build_pattern_scanner(ANALYSIS_PATTERNS)
+
+
+def _scan_java_file(java_file: str) -> Dict[str, str]:
+    """Scan one Java file for ANALYSIS_PATTERNS (also the process pool task)."""
+    return _analysis_scanner()(java_file)
+
+
+def _use_process_pool(file_count: int) -> bool:
+    """Whether per-file work is worth spreading across processes."""
+    return file_count >= PARALLEL_FILE_THRESHOLD and (os.cpu_count() or 1) > 1
+
+
 class MCPMappingLoader:
     """Loads and manages MCP mappings."""
     
@@ -42,54 +590,58 @@ class MCPMappingLoader:
             'methods': {},
             'fields': {}
         }
-        self.reverse_mappings = {
-            'classes': {},
-            'methods': {},
-            'fields': {}
+    
+    # Reverse (mapped -> obfuscated) and remap tables are derived on first access and
+    # dropped whenever more mappings are loaded
+    
+    @functools.cached_property
+    def reverse_classes(self) -> Dict[str, str]:
+        """Mapped class name -> obfuscated class name."""
+        return {mapped: obf for obf, mapped in self.mappings['classes'].items()}
+    
+    @functools.cached_property
+    def reverse_methods(self) -> Dict[str, str]:
+        """Mapped "class.method" -> obfuscated "class.method"."""
+        return {mapped: obf for obf, mapped in self.mappings['methods'].items()}
+    
+    @functools.cached_property
+    def reverse_fields(self) -> Dict[str, str]:
+        """Mapped "class/field" -> obfuscated "class/field"."""
+        return {mapped: obf for obf, mapped in self.mappings['fields'].items()}
+    
+    @functools.cached_property
+    def remap_tables(self) -> Tuple[Optional[re.Pattern], Dict[bytes, bytes], Dict[bytes, bytes]]:
+        """(token_re, class_names, method_names) for remapping Java source."""
+        return _remap_tables(self.mappings)
+    
+    @property
+    def reverse_mappings(self) -> Dict[str, Dict[str, str]]:
+        """All reverse lookup tables (builds any that are not built yet)."""
+        return {
+            'classes': self.reverse_classes,
+            'methods': self.reverse_methods,
+            'fields': self.reverse_fields
         }
     
+    def _clear_derived_tables(self):
+        """Drop derived reverse/remap tables after the forward tables change."""
+        for name in ('reverse_classes', 'reverse_methods', 'reverse_fields', 'remap_tables'):
+            self.__dict__.pop(name, None)
+    
     def load_from_srg(self, srg_file: str):
         """Load mappings from SRG file format."""
         print(f"Loading mappings from {srg_file}...")
+        self._clear_derived_tables()
         
-        with open(srg_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split()
-                if len(parts) < 3:
-                    continue
-                
-                if line.startswith('CL:'):  # Class mapping
-                    # Format: CL: obfuscated mapped
-                    obf = parts[1]
-                    mapped = parts[2]
-                    self.mappings['classes'][obf] = mapped
-                    self.reverse_mappings['classes'][mapped] = obf
-                
-                elif line.startswith('MD:'):  # Method mapping
-                    # Format: MD: obf_class obf_method obf_desc mapped_class mapped_method mapped_desc
-                    if len(parts) >= 6:
-                        obf_class = parts[1]
-                        obf_method = parts[2]
-                        mapped_class = parts[4]
-                        mapped_method = parts[5]
-                        
-                        key = f"{obf_class}.{obf_method}"
-                        value = f"{mapped_class}.{mapped_method}"
-                        self.mappings['methods'][key] = value
-                        self.reverse_mappings['methods'][value] = key
-                
-                elif line.startswith('FD:'):  # Field mapping
-                    # Format: FD: obf_class/obf_field mapped_class/mapped_field
-                    if len(parts) >= 3:
-                        obf_full = parts[1]
-                        mapped_full = parts[2]
-                        
-                        self.mappings['fields'][obf_full] = mapped_full
-                        self.reverse_mappings['fields'][mapped_full] = obf_full
+        # Stamped before parsing, so a file rewritten mid-parse is never cached as current
+        source = _mappings_source_stamp(srg_file)
+        tables = _load_mappings_cache(srg_file, source)
+        if tables is None:
+            tables = _parse_srg(srg_file)
+            _save_mappings_cache(srg_file, source, tables)
+        
+        for kind, table in tables.items():
+            self.mappings[kind].update(table)
         
         print(f"Loaded {len(self.mappings['classes'])} class mappings")
         print(f"Loaded {len(self.mappings['methods'])} method mappings")
@@ -98,70 +650,76 @@ class MCPMappingLoader:
     def load_from_csv(self, csv_file: str):
         """Load mappings from CSV format."""
         import csv
+        self._clear_derived_tables()
+        
+        # Table for each value of the optional 'type' column
+        tables = {
+            'class': self.mappings['classes'],
+            'method': self.mappings['methods'],
+            'field': self.mappings['fields']
+        }
         
         with open(csv_file, 'r') as f:
-            reader = csv.DictReader(f)
+            # Plain rows and column indices instead of a dict per row
+            reader = csv.reader(f)
+            header = next(reader, [])
+            # Adjust based on CSV format
+            if 'obfuscated' not in header or 'mapped' not in header:
+                return
+            obf_col = header.index('obfuscated')
+            mapped_col = header.index('mapped')
+            type_col = header.index('type') if 'type' in header else None
+            min_len = max(obf_col, mapped_col, type_col or 0) + 1
+            
             for row in reader:
-                # Adjust based on CSV format
-                if 'obfuscated' in row and 'mapped' in row:
-                    obf = row['obfuscated']
-                    mapped = row['mapped']
-                    mapping_type = row.get('type', 'class')
-                    
-                    if mapping_type == 'class':
-                        self.mappings['classes'][obf] = mapped
-                    elif mapping_type == 'method':
-                        self.mappings['methods'][obf] = mapped
-                    elif mapping_type == 'field':
-                        self.mappings['fields'][obf] = mapped
+                if len(row) < min_len:
+                    continue
+                table = tables.get(row[type_col] if type_col is not None else 'class')
+                if table is not None:
+                    table[row[obf_col]] = row[mapped_col]
     
     def load_from_proguard(self, mapping_file: str):
         """Load mappings from ProGuard mapping.txt format."""
         print(f"Loading ProGuard mappings from {mapping_file}...")
+        self._clear_derived_tables()
         
+        classes = self.mappings['classes']
+        methods = self.mappings['methods']
+        fields = self.mappings['fields']
         current_class = None
+        mapped_class = None
         
-        with open(mapping_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
+        # Single pass over the lines with str.find instead of repeated split/strip
+        # (every record line contains ' -> ', so anything else is skipped up front)
+        for line in Path(mapping_file).read_text().splitlines():
+            if ' -> ' not in line:
+                continue
+            line = line.strip()
+            # Stripping can remove the space in front of '->' (e.g. '    -> h')
+            arrow = line.find(' -> ')
+            if arrow < 0 or line[0] == '#':
+                continue
+            original = line[:arrow]
+            obfuscated = line[arrow + 4:]
+            if ' -> ' in obfuscated:
+                continue
+            
+            if line[-1] == ':':
                 # ProGuard format:
                 # 'original.class.name' -> 'obfuscated.class.name':
-                if ' -> ' in line and line.endswith(':'):
-                    parts = line.split(' -> ')
-                    if len(parts) == 2:
-                        original = parts[0].strip("'")
-                        obfuscated = parts[1].strip("' :")
-                        self.mappings['classes'][obfuscated] = original
-                        current_class = obfuscated
-                
-                # Method mapping: '    originalMethod(originalDesc) -> obfuscatedMethod'
-                elif current_class and ' -> ' in line and '(' in line:
-                    # Format: "    methodName(desc) -> obfName"
-                    line = line.strip()
-                    if ' -> ' in line:
-                        parts = line.split(' -> ')
-                        if len(parts) == 2:
-                            original_part = parts[0]
-                            obfuscated = parts[1].strip()
-                            
-                            # Extract method name from "methodName(desc)"
-                            if '(' in original_part:
-                                original_method = original_part.split('(')[0]
-                                key = f"{current_class}.{obfuscated}"
-                                self.mappings['methods'][key] = f"{self.mappings['classes'].get(current_class, current_class)}.{original_method}"
-                
-                # Field mapping: '    type originalField -> obfuscatedField'
-                elif current_class and ' -> ' in line and '(' not in line:
-                    line = line.strip()
-                    parts = line.split(' -> ')
-                    if len(parts) == 2:
-                        original_part = parts[0].split()[-1]  # Get field name
-                        obfuscated = parts[1].strip()
-                        key = f"{current_class}/{obfuscated}"
-                        self.mappings['fields'][key] = f"{self.mappings['classes'].get(current_class, current_class)}/{original_part}"
+                current_class = obfuscated.strip("' :")
+                mapped_class = original.strip("'")
+                classes[current_class] = mapped_class
+            
+            elif current_class:
+                obfuscated = obfuscated.strip()
+                paren = original.find('(')
+                if paren >= 0:
+                    # Method mapping: '    originalMethod(originalDesc) -> obfuscatedMethod'
+                    methods[f"{current_class}.{obfuscated}"] = f"{mapped_class}.{original[:paren]}"
+                elif '(' not in obfuscated:
+                    # Field mapping: '    type originalField -> obfuscatedField'
+                    fields[f"{current_class}/{obfuscated}"] = f"{mapped_class}/{original.split()[-1]}"
         
         print(f"Loaded {len(self.mappings['classes'])} class mappings from ProGuard file")
         print(f"Loaded {len(self.mappings['methods'])} method mappings")
@@ -180,21 +738,36 @@ class MCPMappingLoader:
         """Get MCP name for obfuscated field."""
         key = f"{class_name}/{field_name}"
         return self.mappings['fields'].get(key)
+    
+    def get_reverse_class_mapping(self, mapped_name: str) -> Optional[str]:
+        """Get obfuscated name for MCP class."""
+        return self.reverse_classes.get(mapped_name)
+    
+    def get_reverse_method_mapping(self, class_name: str, method_name: str) -> Optional[str]:
+        """Get obfuscated "class.method" for MCP method."""
+        key = f"{class_name}.{method_name}"
+        return self.reverse_methods.get(key)
+    
+    def get_reverse_field_mapping(self, class_name: str, field_name: str) -> Optional[str]:
+        """Get obfuscated "class/field" for MCP field."""
+        key = f"{class_name}/{field_name}"
+        return self.reverse_fields.get(key)
 
 
 class ModDeobfuscator:
     """Decompiles and deobfuscates Minecraft mods."""
     
-    def __init__(self, jar_path: str, mc_version: Optional[str] = None, auto_detect_version: bool = True):
+    def __init__(self, jar_path: str, mc_version: Optional[str] = None, auto_detect_version: bool = True, use_nailgun: bool = False):
         self.jar_path = Path(jar_path)
+        # Run the Java tools in a running Nailgun server instead of fresh JVMs (opt-in)
+        self.use_nailgun = use_nailgun
         
         # Auto-detect version if not provided
         if mc_version is None and auto_detect_version:
             print("Detecting Minecraft version from mod...")
             try:
-                detector = VersionDetector(str(self.jar_path))
-                detected_version = detector.detect()
-                detector.close()
+                with VersionDetector(str(self.jar_path)) as detector:
+                    detected_version = detector.detect()
                 if detected_version:
                     self.mc_version = detected_version
                     print(f"✓ Detected Minecraft version: {self.mc_version}")
@@ -208,6 +781,7 @@ class ModDeobfuscator:
             self.mc_version = mc_version or "1.8.9"
         
         self.mappings = MCPMappingLoader(self.mc_version)
+        self.mappings_path = None  # Set by load_mappings
         self.decompiled_dir = None
         self.deobfuscated_dir = None
         self.tool_manager = ToolManager()
@@ -269,38 +843,35 @@ class ModDeobfuscator:
                 print("Or specify path with --decompiler-path option")
                 return self.decompiled_dir
         
-        # Build command based on decompiler
+        # Build command based on decompiler (absolute paths, see _java_jar_command)
+        jar_arg = str(self.jar_path.resolve())
+        output_arg = str(self.decompiled_dir.resolve())
         if decompiler == "cfr":
-            cmd = [
-                "java", "-jar", str(decompiler_jar),
-                str(self.jar_path),
-                "--outputdir", str(self.decompiled_dir),
+            cmd = _java_jar_command(decompiler_jar, self.use_nailgun) + [
+                jar_arg,
+                "--outputdir", output_arg,
                 "--caseinsensitivefs", "true"
             ]
         elif decompiler == "jd-cli":
-            cmd = [
-                "java", "-jar", str(decompiler_jar),
-                str(self.jar_path),
-                "-od", str(self.decompiled_dir)
+            cmd = _java_jar_command(decompiler_jar, self.use_nailgun) + [
+                jar_arg,
+                "-od", output_arg
             ]
         elif decompiler == "fernflower":
-            cmd = [
-                "java", "-jar", str(decompiler_jar),
-                str(self.jar_path),
-                str(self.decompiled_dir)
+            cmd = _java_jar_command(decompiler_jar, self.use_nailgun) + [
+                jar_arg,
+                output_arg
             ]
         else:
             print(f"✗ Unsupported decompiler: {decompiler}")
             return self.decompiled_dir
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            if result.returncode == 0:
+            returncode, stderr = _run_tool(cmd, timeout=300)
+            if returncode == 0:
                 print(f"✓ Decompiled to {self.decompiled_dir}")
             else:
-                print(f"⚠ Decompilation warnings: {result.stderr[:500]}")
-                if result.stdout:
-                    print(f"Output: {result.stdout[:200]}")
+                print(f"⚠ Decompilation warnings: {stderr}")
         except subprocess.TimeoutExpired:
             print("⚠ Decompilation timed out")
         except Exception as e:
@@ -308,23 +879,27 @@ class ModDeobfuscator:
         
         return self.decompiled_dir
     
-    def load_mappings(self, mappings_file: Optional[str] = None, auto_download: bool = True):
-        """Load MCP mappings from file, or auto-download if not provided."""
+    def load_mappings(self, mappings_file: Optional[str] = None, auto_download: bool = True) -> Optional[Path]:
+        """
+        Load MCP mappings from file, or auto-download if not provided.
+        
+        Returns the path the mappings were loaded from (also kept as self.mappings_path),
+        or None if no mappings could be loaded.
+        """
         # If no mappings file provided, try to auto-download
         if mappings_file is None and auto_download:
             print(f"\nNo mappings file provided. Attempting to download for Minecraft {self.mc_version}...")
-            downloader = MappingsDownloader()
-            mappings_path = downloader.get_mappings(self.mc_version)
+            mappings_path = get_cached_mappings(self.mc_version)
             if mappings_path:
                 mappings_file = str(mappings_path)
                 print(f"✓ Using downloaded mappings: {mappings_file}")
             else:
                 print(f"⚠ Could not download mappings for {self.mc_version}")
                 print("Continuing without deobfuscation...")
-                return False
+                return None
         
         if mappings_file is None:
-            return False
+            return None
         
         mappings_path = Path(mappings_file)
         
@@ -332,8 +907,7 @@ class ModDeobfuscator:
             print(f"⚠ Mappings file not found: {mappings_file}")
             if auto_download:
                 print(f"Attempting to download mappings for Minecraft {self.mc_version}...")
-                downloader = MappingsDownloader()
-                mappings_path = downloader.get_mappings(self.mc_version)
+                mappings_path = get_cached_mappings(self.mc_version)
                 if mappings_path:
                     mappings_file = str(mappings_path)
                     mappings_path = Path(mappings_file)
@@ -343,14 +917,14 @@ class ModDeobfuscator:
                     print("2. Or use Forge's mapping files")
                     print("3. Or extract from MCP/Forge installation")
                     print("4. Or use ProGuard mapping.txt if available")
-                    return False
+                    return None
             else:
                 print("\nTo get mappings:")
                 print("1. Download from MCPBot: http://export.mcpbot.bspk.rs/")
                 print("2. Or use Forge's mapping files")
                 print("3. Or extract from MCP/Forge installation")
                 print("4. Or use ProGuard mapping.txt if available")
-                return False
+                return None
         
         if mappings_file.endswith('.srg'):
             self.mappings.load_from_srg(mappings_file)
@@ -365,9 +939,10 @@ class ModDeobfuscator:
             try:
                 self.mappings.load_from_srg(mappings_file)
             except:
-                return False
+                return None
         
-        return True
+        self.mappings_path = mappings_path
+        return mappings_path
     
     def apply_mappings_with_specialsource(self, mappings_file: str, output_jar: Optional[str] = None) -> Optional[Path]:
         """
@@ -389,21 +964,20 @@ class ModDeobfuscator:
         
         print(f"\nApplying mappings with SpecialSource...")
         
-        cmd = [
-            "java", "-jar", str(specialsource_jar),
-            "--in-jar", str(self.jar_path),
-            "--out-jar", str(output_path),
-            "--mappings", mappings_file,
+        cmd = _java_jar_command(specialsource_jar, self.use_nailgun) + [
+            "--in-jar", str(self.jar_path.resolve()),
+            "--out-jar", str(output_path.resolve()),
+            "--mappings", os.path.abspath(mappings_file),
             "--live"
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            if result.returncode == 0:
+            returncode, stderr = _run_tool(cmd, timeout=300)
+            if returncode == 0:
                 print(f"✓ Remapped JAR saved to {output_path}")
                 return output_path
             else:
-                print(f"⚠ SpecialSource warnings: {result.stderr[:500]}")
+                print(f"⚠ SpecialSource warnings: {stderr}")
                 return None
         except Exception as e:
             print(f"✗ Error applying mappings: {e}")
@@ -411,67 +985,8 @@ class ModDeobfuscator:
     
     def apply_mappings_to_java(self, java_file: Path, output_file: Path):
         """Apply MCP mappings to a decompiled Java file."""
-        content = java_file.read_text(encoding='utf-8', errors='ignore')
-        original_content = content
-        
-        # Apply class name mappings
-        # Match class references: "class a", "extends a", "implements a", "new a()", "a.method()"
-        for obf, mapped in self.mappings.mappings['classes'].items():
-            # Get just the class name (last part after package)
-            mapped_class_name = mapped.split('.')[-1] if '.' in mapped else mapped
-            
-            # Replace class declarations
-            content = re.sub(
-                rf'\bclass\s+{re.escape(obf)}\b',
-                f'class {mapped_class_name}',
-                content
-            )
-            
-            # Replace extends/implements
-            content = re.sub(
-                rf'\bextends\s+{re.escape(obf)}\b',
-                f'extends {mapped_class_name}',
-                content
-            )
-            content = re.sub(
-                rf'\bimplements\s+{re.escape(obf)}\b',
-                f'implements {mapped_class_name}',
-                content
-            )
-            
-            # Replace variable/field types
-            content = re.sub(
-                rf'\b{re.escape(obf)}\s+(\w+)',
-                f'{mapped_class_name} \\1',
-                content
-            )
-            
-            # Replace new instances
-            content = re.sub(
-                rf'\bnew\s+{re.escape(obf)}\s*\(',
-                f'new {mapped_class_name}(',
-                content
-            )
-        
-        # Apply method mappings (simplified - full implementation is complex)
-        for obf_key, mapped_key in self.mappings.mappings['methods'].items():
-            obf_class, obf_method = obf_key.split('.', 1)
-            mapped_class, mapped_method = mapped_key.split('.', 1)
-            
-            # Replace method calls: obf_class.obf_method( or obf_method(
-            if obf_method in content:
-                # Simple replacement (may have false positives)
-                content = re.sub(
-                    rf'\b{re.escape(obf_method)}\s*\(',
-                    f'{mapped_method}(',
-                    content
-                )
-        
-        # Write deobfuscated file
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(content, encoding='utf-8')
-        
-        return content != original_content
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        return _remap_java_file(str(java_file), str(output_file), *self.mappings.remap_tables)
     
     def deobfuscate(self, mappings_file: Optional[str] = None, output_dir: Optional[str] = None, auto_download: bool = True) -> Path:
         """Deobfuscate decompiled code using mappings."""
@@ -479,19 +994,9 @@ class ModDeobfuscator:
             print("⚠ Must decompile first!")
             return None
         
-        if not self.load_mappings(mappings_file, auto_download=auto_download):
+        if self.load_mappings(mappings_file, auto_download=auto_download) is None:
             return None
         
-        # Get the mappings file path after loading
-        if mappings_file is None:
-            # Try to find downloaded mappings
-            downloader = MappingsDownloader()
-            mappings_path = downloader.get_mappings(self.mc_version)
-            if mappings_path:
-                mappings_file = str(mappings_path)
-            else:
-                return None
-        
         if output_dir is None:
             output_dir = self.jar_path.stem + "_deobfuscated"
         
@@ -500,16 +1005,26 @@ class ModDeobfuscator:
         
         print(f"\nDeobfuscating code...")
         
-        java_files = list(self.decompiled_dir.rglob("*.java"))
-        deobfuscated_count = 0
+        decompiled_root = str(self.decompiled_dir)
+        deobfuscated_root = str(self.deobfuscated_dir)
+        # (java_file, output_file) pairs, mirroring the decompiled tree
+        tasks = [
+            (java_file, os.path.join(deobfuscated_root, os.path.relpath(java_file, decompiled_root)))
+            for java_file in _iter_java_files(decompiled_root)
+        ]
         
-        for java_file in java_files:
-            # Calculate relative path
-            rel_path = java_file.relative_to(self.decompiled_dir)
-            output_file = self.deobfuscated_dir / rel_path
-            
-            if self.apply_mappings_to_java(java_file, output_file):
-                deobfuscated_count += 1
+        # Output directories are created once each here, not per file by the workers
+        for output_subdir in {os.path.dirname(output_file) for _, output_file in tasks}:
+            os.makedirs(output_subdir, exist_ok=True)
+        
+        if _use_process_pool(len(tasks)):
+            # Files are independent: remap them in parallel, shipping the mapping
+            # tables to each worker once instead of with every file
+            with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_remap_worker, initargs=self.mappings.remap_tables) as executor:
+                deobfuscated_count = sum(executor.map(_remap_java_file_in_worker, tasks, chunksize=PARALLEL_CHUNKSIZE))
+        else:
+            tables = self.mappings.remap_tables
+            deobfuscated_count = sum(_remap_java_file(java_file, output_file, *tables) for java_file, output_file in tasks)
         
         print(f"✓ Deobfuscated {deobfuscated_count} files")
         print(f"✓ Output: {self.deobfuscated_dir}")
@@ -524,59 +1039,23 @@ class ModDeobfuscator:
         
         print("\nAnalyzing deobfuscated code...")
         
-        java_files = list(self.deobfuscated_dir.rglob("*.java"))
+        deobfuscated_root = str(self.deobfuscated_dir)
+        file_paths = list(_iter_java_files(deobfuscated_root))
         
-        findings = {
-            'webhook_references': [],
-            'token_access': [],
-            'network_code': [],
-            'session_access': [],
-            'discord_references': []
-        }
+        findings = {category: [] for category in ANALYSIS_PATTERNS}
         
-        patterns = {
-            'webhook_references': [
-                r'webhook',
-                r'discord\.com/api/webhooks',
-                r'https?://.*webhook'
-            ],
-            'token_access': [
-                r'\.getToken\(\)',
-                r'\.getSession\(\)',
-                r'accessToken',
-                r'sessionToken'
-            ],
-            'network_code': [
-                r'HttpURLConnection',
-                r'URLConnection',
-                r'\.openConnection\(\)',
-                r'URL\(.*http'
-            ],
-            'session_access': [
-                r'Minecraft\.getMinecraft\(\)\.getSession\(\)',
-                r'Session\.class',
-                r'net\.minecraft\.util\.Session'
-            ],
-            'discord_references': [
-                r'discord',
-                r'Discord'
-            ]
-        }
+        if _use_process_pool(len(file_paths)):
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                results = list(executor.map(_scan_java_file, file_paths, chunksize=PARALLEL_CHUNKSIZE))
+        else:
+            results = [_scan_java_file(path) for path in file_paths]
         
-        for java_file in java_files:
-            try:
-                content = java_file.read_text(encoding='utf-8', errors='ignore')
-                
-                for category, pattern_list in patterns.items():
-                    for pattern in pattern_list:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            findings[category].append({
-                                'file': str(java_file.relative_to(self.deobfuscated_dir)),
-                                'pattern': pattern
-                            })
-                            break  # Only report once per file per category
-            except Exception as e:
-                continue
+        for java_file, hits in zip(file_paths, results):
+            for category, pattern in hits.items():
+                findings[category].append({
+                    'file': os.path.relpath(java_file, deobfuscated_root),
+                    'pattern': pattern
+                })
         
         # Print findings
         print("\n" + "=" * 60)
@@ -602,8 +1081,10 @@ def main():
         print("  --mc-version <ver>     Minecraft version (default: 1.8.9)")
         print("  --output <dir>         Output directory")
         print("  --analyze              Analyze deobfuscated code")
-        print("  --use-specialsource    Use SpecialSource for mapping (recommended)")
+        print("  --use-specialsource    Use SpecialSource for mapping (default, strongly recommended)")
+        print("  --no-specialsource     Apply mappings as text to the decompiled code instead")
         print("  --no-auto-download     Disable auto-download of tools and mappings")
+        print("  --nailgun              Run the decompiler/SpecialSource in a running Nailgun server")
         print("\nExample:")
         print("  python mod_deobfuscator.py mod.jar mappings.srg --analyze")
         print("  python mod_deobfuscator.py mod.jar  # Auto-detects version and downloads mappings")
@@ -620,6 +1101,7 @@ def main():
     output_dir = None
     analyze = False
     use_specialsource = True
+    use_nailgun = False
     
     i = 2
     while i < len(sys.argv):
@@ -644,6 +1126,9 @@ def main():
         elif sys.argv[i] == '--no-specialsource':
             use_specialsource = False
             i += 1
+        elif sys.argv[i] == '--nailgun':
+            use_nailgun = True
+            i += 1
         elif sys.argv[i] == '--no-auto-download':
             # Handled in main function
             i += 1
@@ -654,13 +1139,12 @@ def main():
         # Parse auto-download flag
         auto_download = '--no-auto-download' not in sys.argv
         
-        deobfuscator = ModDeobfuscator(jar_path, mc_version, auto_detect_version=True)
+        deobfuscator = ModDeobfuscator(jar_path, mc_version, auto_detect_version=True, use_nailgun=use_nailgun)
         
         # Auto-download mappings if not provided
         if mappings_file is None and auto_download:
             print(f"\nNo mappings file provided. Attempting to auto-download for Minecraft {deobfuscator.mc_version}...")
-            downloader = MappingsDownloader()
-            downloaded_mappings = downloader.get_mappings(deobfuscator.mc_version)
+            downloaded_mappings = get_cached_mappings(deobfuscator.mc_version)
             if downloaded_mappings:
                 mappings_file = str(downloaded_mappings)
                 print(f"✓ Using auto-downloaded mappings: {mappings_file}")
@@ -674,13 +1158,21 @@ def main():
         jar_to_decompile = remapped_jar if remapped_jar else deobfuscator.jar_path
         if remapped_jar:
             # Create new deobfuscator for remapped JAR
-            deobfuscator = ModDeobfuscator(jar_to_decompile, mc_version, auto_detect_version=False)
+            deobfuscator = ModDeobfuscator(jar_to_decompile, mc_version, auto_detect_version=False, use_nailgun=use_nailgun)
         
         # Decompile (with auto-install enabled)
         deobfuscator.decompile(decompiler, decompiler_path, output_dir, auto_install=auto_download)
         
-        # Apply text-based mappings to decompiled code (for additional cleanup)
-        if mappings_file or auto_download:
+        if remapped_jar:
+            # The bytecode is already remapped, so the decompiled sources need no
+            # text-based rewrite (that is only the fallback without SpecialSource)
+            print("\n✓ Mappings applied by SpecialSource, skipping text-based deobfuscation")
+            if analyze:
+                deobfuscator.deobfuscated_dir = deobfuscator.decompiled_dir
+                deobfuscator.analyze_deobfuscated()
+        
+        # Apply text-based mappings to decompiled code
+        elif mappings_file or auto_download:
             deobfuscator.deobfuscate(mappings_file, output_dir, auto_download=auto_download)
             
             if analyze:
@@ -4,6 +4,8 @@ Vulture - Tool Manager
 Manages downloading and installing decompiler tools and mappings
 """
 
+import functools
+import hashlib
 import os
 import sys
 import subprocess
@@ -11,10 +13,229 @@ import json
 import re
 import zipfile
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, List
-import requests
-from urllib.parse import urlparse
+from typing import TYPE_CHECKING, Optional, Dict, List
+from urllib.parse import unquote, urlparse
+
+if TYPE_CHECKING:
+    import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# User-Agent sent with every download request
+USER_AGENT = "Vulture-ToolManager"
+
+# Headers for GitHub API requests: the versioned JSON media type, compressed on the wire
+GITHUB_API_HEADERS = {
+    'Accept': 'application/vnd.github+json',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Read/write buffer size for streamed downloads
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Downloaded archives up to this size are buffered in memory instead of a temporary file
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+# How long (seconds) a looked-up latest CFR version is reused before asking GitHub again
+CFR_VERSION_CACHE_TTL = 24 * 60 * 60
+
+
+def _create_session() -> 'requests.Session':
+    """
+    Create an HTTP session with connection pooling and retries on transient errors.
+    
+    Reusing one session keeps connections to GitHub alive across downloads
+    instead of opening a new TCP/TLS connection for every request.
+    """
+    # Imported here so commands that never download skip loading requests/urllib3/ssl
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def _copy_response(response: 'requests.Response', f) -> str:
+    """
+    Stream a response body into an open binary file straight from the raw socket.
+    
+    Returns:
+        SHA-256 hex digest of the body
+        
+    Raises:
+        IOError: If fewer bytes arrived than the Content-Length promised
+    """
+    # Let urllib3 undo any Content-Encoding while we bypass iter_content()
+    response.raw.decode_content = True
+    digest = hashlib.sha256()
+    written = 0
+    while True:
+        chunk = response.raw.read(DOWNLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        f.write(chunk)
+        written += len(chunk)
+    
+    # Content-Length counts encoded bytes, so it only applies to identity responses
+    expected = response.headers.get('Content-Length')
+    if expected and not response.headers.get('Content-Encoding') and written != int(expected):
+        raise IOError(f"incomplete download ({written} of {expected} bytes)")
+    
+    return digest.hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 hex digest of a file, read in DOWNLOAD_CHUNK_SIZE blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verify_jar(path: Path):
+    """
+    Check that a file is a non-empty ZIP/JAR (reads the central directory only).
+    
+    Raises:
+        zipfile.BadZipFile: If it is not
+    """
+    with zipfile.ZipFile(path, 'r') as z:
+        if not z.namelist():
+            raise zipfile.BadZipFile("empty archive")
+
+
+def _write_response(response: 'requests.Response', dest: Path, verify=None) -> str:
+    """
+    Stream a response body to dest through a .part file, moved into place only once complete.
+    
+    Any failure (a dropped connection, a short body, a failed check) removes the partial
+    file and leaves an existing dest untouched.
+    
+    Args:
+        response: Streaming response to read
+        dest: Final file path
+        verify: Optional check run on the finished download; if it raises, the file is discarded
+    
+    Returns:
+        SHA-256 hex digest of the written file
+        
+    Raises:
+        IOError: If fewer bytes arrived than the Content-Length promised
+    """
+    partial = dest.with_suffix(dest.suffix + '.part')
+    try:
+        with open(partial, 'wb') as f:
+            sha256 = _copy_response(response, f)
+        if verify is not None:
+            verify(partial)
+        os.replace(partial, dest)
+        return sha256
+    except Exception:
+        partial.unlink(missing_ok=True)
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def nailgun_running() -> bool:
+    """Whether a Nailgun client is on PATH and a server is answering (probed once per process)."""
+    if shutil.which("ng"):
+        try:
+            probe = subprocess.run(["ng", "ng-version"], capture_output=True, timeout=5)
+            return probe.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    return False
+
+
+def _jar_main_class(jar_path: str) -> Optional[str]:
+    """Main-Class from a JAR's manifest, or None."""
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            manifest = jar.read('META-INF/MANIFEST.MF').decode('utf-8', 'replace')
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    # Manifest lines longer than 72 bytes continue on lines starting with a space
+    manifest = manifest.replace('\r\n', '\n').replace('\n ', '')
+    for line in manifest.splitlines():
+        if line.startswith('Main-Class:'):
+            return line.split(':', 1)[1].strip() or None
+    return None
+
+
+def _classpath_entry_provides(entry: str, class_file: str) -> bool:
+    """Whether a classpath entry (directory or JAR) contains class_file."""
+    if os.path.isdir(entry):
+        return os.path.isfile(os.path.join(entry, class_file))
+    try:
+        with zipfile.ZipFile(entry) as jar:
+            jar.getinfo(class_file)
+        return True
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def nailgun_main_class(jar_path: str) -> Optional[str]:
+    """
+    Put an executable JAR on the Nailgun server's classpath and return its Main-Class.
+    
+    The server has one classpath shared by everything it runs, and the first entry
+    providing a class wins. So None is returned (run the JAR as its own process
+    instead) if another classpath entry already provides the Main-Class, e.g. a
+    different version of the same tool. Also None if the JAR has no Main-Class or the
+    server cannot be asked.
+    """
+    main_class = _jar_main_class(jar_path)
+    if main_class is None:
+        return None
+    class_file = main_class.replace('.', '/') + '.class'
+    
+    try:
+        # Without arguments ng-cp lists the server's classpath, one URL per line
+        listing = subprocess.run(["ng", "ng-cp"], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if listing.returncode != 0:
+        return None
+    
+    jar_real = os.path.realpath(jar_path)
+    on_classpath = False
+    for line in listing.stdout.splitlines():
+        line = line.strip()
+        entry = unquote(urlparse(line).path) if line.startswith('file:') else line
+        if not entry:
+            continue
+        if os.path.realpath(entry) == jar_real:
+            on_classpath = True
+        elif _classpath_entry_provides(entry, class_file):
+            print(f"⚠ {main_class} is already on the Nailgun classpath from {entry}, "
+                  f"running {Path(jar_path).name} in its own JVM")
+            return None
+    
+    if not on_classpath:
+        try:
+            added = subprocess.run(["ng", "ng-cp", jar_path], capture_output=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if added.returncode != 0:
+            return None
+    return main_class
 
 
 class ToolManager:
@@ -38,13 +259,38 @@ class ToolManager:
         self.tools_dir.mkdir(parents=True, exist_ok=True)
         self.config_file = self.tools_dir / "tools_config.json"
         self.config = self._load_config()
+        # Installers may run concurrently (ensure_all_tools), so guard config updates
+        self._config_lock = threading.RLock()
+        # HTTP session, created on first download
+        self._session: Optional['requests.Session'] = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self) -> 'requests.Session':
+        """HTTP session shared by all downloads."""
+        with self._session_lock:
+            if self._session is None:
+                self._session = _create_session()
+            return self._session
+    
+    def close(self):
+        """Close the HTTP session and its pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def _load_config(self) -> Dict:
         """Load tool configuration."""
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                data = self.config_file.read_bytes()
+                return orjson.loads(data) if orjson else json.loads(data)
             except:
                 pass
         return {
@@ -56,18 +302,96 @@ class ToolManager:
     
     def _save_config(self):
         """Save tool configuration."""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.config, f, indent=2)
+        with self._config_lock:
+            if orjson:
+                self.config_file.write_bytes(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w') as f:
+                    json.dump(self.config, f, indent=2)
+    
+    def _record_install(self, tool: str, version: str, sha256: Optional[str] = None,
+                        etag: Optional[str] = None):
+        """Record an installed tool version (and its JAR hash and ETag) and save the configuration."""
+        with self._config_lock:
+            self.config[f'{tool}_version'] = version
+            self.config.setdefault('installed_tools', {})[tool] = version
+            if sha256:
+                self.config.setdefault('installed_sha256', {})[tool] = sha256
+            if etag:
+                self.config.setdefault('installed_etags', {})[tool] = etag
+            self._save_config()
+    
+    def _jar_matches_remote(self, tool: str, url: str, local_path: Path) -> bool:
+        """
+        Check with a HEAD request whether an existing JAR is the same file as the one at url.
+        
+        The JAR on disk is first checked against the SHA-256 recorded when it was
+        downloaded, so a modified or damaged file is replaced without asking the server.
+        
+        Args:
+            tool: Tool key used in the configuration
+            url: Download URL of the JAR
+            local_path: Installed JAR
+            
+        Returns:
+            True if the local hash (when one was recorded) and the remote Content-Length
+            (and ETag, when one was recorded) match
+        """
+        try:
+            recorded_sha256 = self.config.get('installed_sha256', {}).get(tool)
+            if recorded_sha256 and _file_sha256(local_path) != recorded_sha256:
+                return False
+            
+            response = self.session.head(url, allow_redirects=True, timeout=5)
+            if response.status_code != 200:
+                return False
+            length = response.headers.get('Content-Length')
+            if length is None or int(length) != local_path.stat().st_size:
+                return False
+            recorded_etag = self.config.get('installed_etags', {}).get(tool)
+            remote_etag = response.headers.get('ETag')
+            return not (recorded_etag and remote_etag and recorded_etag != remote_etag)
+        except Exception:
+            return False
     
     def get_latest_cfr_version(self) -> Optional[str]:
-        """Get latest CFR version from GitHub releases."""
+        """Get latest CFR version from GitHub releases (cached for CFR_VERSION_CACHE_TTL)."""
+        cached_version = self.config.get('cfr_latest_version')
+        checked_at = self.config.get('cfr_latest_version_checked_at') or 0
+        if cached_version and time.time() - checked_at < CFR_VERSION_CACHE_TTL:
+            return cached_version
+        
+        version = self._fetch_latest_cfr_version()
+        if version:
+            with self._config_lock:
+                self.config['cfr_latest_version'] = version
+                self.config['cfr_latest_version_checked_at'] = time.time()
+                self._save_config()
+            return version
+        
+        return "0.152"  # Fallback version
+    
+    def _fetch_latest_cfr_version(self) -> Optional[str]:
+        """Ask the GitHub API for the latest CFR release version."""
         try:
-            # Try to get latest release
-            response = requests.get(
+            # Try to get latest release, revalidating the cached answer by ETag
+            headers = dict(GITHUB_API_HEADERS)
+            cached_version = self.config.get('cfr_latest_version')
+            etag = self.config.get('cfr_latest_etag')
+            if cached_version and etag:
+                headers['If-None-Match'] = etag
+            
+            response = self.session.get(
                 "https://api.github.com/repos/leibnitz27/cfr/releases/latest",
+                headers=headers,
                 timeout=10
             )
+            if response.status_code == 304:
+                # Unchanged since the last lookup (does not count against the rate limit)
+                return cached_version
             if response.status_code == 200:
+                with self._config_lock:
+                    self.config['cfr_latest_etag'] = response.headers.get('ETag')
                 data = response.json()
                 tag = data.get('tag_name', '')
                 # Extract version number
@@ -75,9 +399,11 @@ class ToolManager:
                 if version_match:
                     return version_match.group(1)
             
-            # Fallback: try to parse releases page
-            response = requests.get(
+            # Fallback: try to parse releases page (only the newest entry is used)
+            response = self.session.get(
                 "https://api.github.com/repos/leibnitz27/cfr/releases",
+                params={'per_page': 1},
+                headers=GITHUB_API_HEADERS,
                 timeout=10
             )
             if response.status_code == 200:
@@ -90,23 +416,26 @@ class ToolManager:
         except Exception as e:
             print(f"⚠ Could not fetch latest CFR version: {e}")
         
-        return "0.152"  # Fallback version
+        return None
     
     def install_cfr(self, version: Optional[str] = None, force: bool = False) -> bool:
         """Install CFR decompiler."""
+        cfr_jar = self.tools_dir / "cfr.jar"
+        
         if version is None:
+            # Any installed CFR is good enough unless forced, so skip the version lookup
+            installed = self.config.get('installed_tools', {}).get('cfr')
+            if installed and cfr_jar.exists() and not force:
+                print(f"✓ CFR {installed} already installed")
+                return True
             version = self.get_latest_cfr_version()
         
-        cfr_jar = self.tools_dir / "cfr.jar"
-        
         # Check if already installed
         if cfr_jar.exists() and not force:
             if self.config.get('installed_tools', {}).get('cfr') == version:
                 print(f"✓ CFR {version} already installed")
                 return True
         
-        print(f"Downloading CFR {version}...")
-        
         # Try multiple download URLs
         urls = [
             f"https://github.com/leibnitz27/cfr/releases/latest/download/cfr.jar",
@@ -114,27 +443,27 @@ class ToolManager:
             f"https://github.com/leibnitz27/cfr/releases/download/0.152/cfr-0.152.jar",
         ]
         
+        # A different recorded version may still be the same file, so ask before downloading
+        if cfr_jar.exists() and not force and self._jar_matches_remote('cfr', urls[1], cfr_jar):
+            print(f"✓ CFR {version} already installed")
+            self._record_install('cfr', version)
+            return True
+        
+        print(f"Downloading CFR {version}...")
+        
         for url in urls:
             try:
-                response = requests.get(url, timeout=30, stream=True)
+                response = self.session.get(url, timeout=30, stream=True)
                 if response.status_code == 200:
-                    with open(cfr_jar, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    # Verify it's a valid JAR
+                    # Only replaces cfr.jar once the download is complete and a valid JAR
                     try:
-                        with zipfile.ZipFile(cfr_jar, 'r') as z:
-                            z.testzip()
-                        print(f"✓ CFR {version} installed successfully")
-                        self.config['cfr_version'] = version
-                        self.config.setdefault('installed_tools', {})['cfr'] = version
-                        self._save_config()
-                        return True
-                    except:
+                        sha256 = _write_response(response, cfr_jar, verify=_verify_jar)
+                    except zipfile.BadZipFile:
                         print(f"⚠ Downloaded file is not a valid JAR, trying next URL...")
-                        cfr_jar.unlink()
                         continue
+                    print(f"✓ CFR {version} installed successfully")
+                    self._record_install('cfr', version, sha256, response.headers.get('ETag'))
+                    return True
             except Exception as e:
                 print(f"⚠ Failed to download from {url}: {e}")
                 continue
@@ -160,39 +489,30 @@ class ToolManager:
         
         for url in urls:
             try:
-                response = requests.get(url, timeout=30, stream=True)
+                response = self.session.get(url, timeout=30, stream=True)
                 if response.status_code == 200:
-                    tar_path = self.tools_dir / "jd-cli.tar.gz"
-                    with open(tar_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    # Extract JAR from tarball
+                    # Extract the JAR while the tarball streams in, without saving the archive
+                    partial_jar = jd_cli_jar.with_suffix('.jar.part')
                     try:
                         import tarfile
-                        import tempfile
-                        with tarfile.open(tar_path, 'r:gz') as tar:
+                        response.raw.decode_content = True
+                        with tarfile.open(fileobj=response.raw, mode='r|gz') as tar:
                             # Find the JAR file in the archive
-                            for member in tar.getmembers():
-                                if member.name.endswith('.jar') and 'jd-cli' in member.name:
-                                    tar.extract(member, self.tools_dir)
-                                    extracted_jar = self.tools_dir / member.name.split('/')[-1]
-                                    if extracted_jar.exists():
-                                        shutil.move(str(extracted_jar), str(jd_cli_jar))
-                                        break
-                        
-                        tar_path.unlink()
+                            for member in tar:
+                                if member.isfile() and member.name.endswith('.jar') and 'jd-cli' in member.name:
+                                    with tar.extractfile(member) as src, open(partial_jar, 'wb') as dst:
+                                        shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
+                                    os.replace(partial_jar, jd_cli_jar)
+                                    break
                         
                         if jd_cli_jar.exists():
                             print(f"✓ JD-CLI {version} installed successfully")
-                            self.config['jd_cli_version'] = version
-                            self.config.setdefault('installed_tools', {})['jd_cli'] = version
-                            self._save_config()
+                            self._record_install('jd_cli', version)
                             return True
                     except Exception as e:
                         print(f"⚠ Failed to extract JD-CLI: {e}")
-                        if tar_path.exists():
-                            tar_path.unlink()
+                        if partial_jar.exists():
+                            partial_jar.unlink()
                         continue
             except Exception as e:
                 print(f"⚠ Failed to download from {url}: {e}")
@@ -211,34 +531,32 @@ class ToolManager:
                 print(f"✓ SpecialSource {version} already installed")
                 return True
         
-        print(f"Downloading SpecialSource {version}...")
-        
         urls = [
             f"https://github.com/md-5/SpecialSource/releases/download/{version}/SpecialSource-{version}-shaded.jar",
             f"https://repo.md-5.net/content/repositories/releases/net/md-5/SpecialSource/{version}/SpecialSource-{version}-shaded.jar",
         ]
         
+        # A different recorded version may still be the same file, so ask before downloading
+        if specialsource_jar.exists() and not force and self._jar_matches_remote('specialsource', urls[0], specialsource_jar):
+            print(f"✓ SpecialSource {version} already installed")
+            self._record_install('specialsource', version)
+            return True
+        
+        print(f"Downloading SpecialSource {version}...")
+        
         for url in urls:
             try:
-                response = requests.get(url, timeout=30, stream=True)
+                response = self.session.get(url, timeout=30, stream=True)
                 if response.status_code == 200:
-                    with open(specialsource_jar, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    # Verify it's a valid JAR
+                    # Only replaces specialsource.jar once the download is complete and a valid JAR
                     try:
-                        with zipfile.ZipFile(specialsource_jar, 'r') as z:
-                            z.testzip()
-                        print(f"✓ SpecialSource {version} installed successfully")
-                        self.config['specialsource_version'] = version
-                        self.config.setdefault('installed_tools', {})['specialsource'] = version
-                        self._save_config()
-                        return True
-                    except:
+                        sha256 = _write_response(response, specialsource_jar, verify=_verify_jar)
+                    except zipfile.BadZipFile:
                         print(f"⚠ Downloaded file is not a valid JAR, trying next URL...")
-                        specialsource_jar.unlink()
                         continue
+                    print(f"✓ SpecialSource {version} installed successfully")
+                    self._record_install('specialsource', version, sha256, response.headers.get('ETag'))
+                    return True
             except Exception as e:
                 print(f"⚠ Failed to download from {url}: {e}")
                 continue
@@ -251,9 +569,14 @@ class ToolManager:
         print("Checking tool installations...")
         print("=" * 60)
         
-        self.install_cfr(force=force)
-        self.install_jd_cli(force=force)
-        self.install_specialsource(force=force)
+        # Each tool comes from a different host, so download them concurrently
+        installers = [self.install_cfr, self.install_jd_cli, self.install_specialsource]
+        with ThreadPoolExecutor(max_workers=len(installers)) as executor:
+            futures = [executor.submit(installer, force=force) for installer in installers]
+            results = [future.result() for future in futures]
+        
+        if not all(results):
+            print("⚠ Some tools could not be installed")
         
         print("=" * 60)
         print("Tool installation check complete!")
@@ -263,7 +586,12 @@ class ToolManager:
 class MappingsDownloader:
     """Downloads Minecraft version mappings."""
     
-    def __init__(self, mappings_dir: Optional[str] = None):
+    def __init__(self, mappings_dir: Optional[str] = None, session: Optional['requests.Session'] = None):
+        """
+        Args:
+            mappings_dir: Mappings directory (auto-detected if not specified)
+            session: HTTP session to reuse, e.g. ToolManager.session (a new one is created if not specified)
+        """
         # Try to use config for mappings_dir
         try:
             from config import Config
@@ -279,6 +607,29 @@ class MappingsDownloader:
                 self.mappings_dir = Path(mappings_dir)
         
         self.mappings_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Borrowed session, or one of our own created on first download
+        self._session = session
+        self._owns_session = session is None
+    
+    @property
+    def session(self) -> 'requests.Session':
+        """HTTP session used for downloads."""
+        if self._session is None:
+            self._session = _create_session()
+        return self._session
+    
+    def close(self):
+        """Close the HTTP session if it was created by this downloader."""
+        if self._owns_session and self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def download_mcp_mappings(self, mc_version: str) -> Optional[Path]:
         """Download MCP mappings for a Minecraft version from MCPBot."""
@@ -287,7 +638,6 @@ class MappingsDownloader:
         # MCPBot export URL format
         url = f"http://export.mcpbot.bspk.rs/mcp_snapshot/{mc_version}/mcp_snapshot-{mc_version}.zip"
         
-        zip_path = self.mappings_dir / f"mcp_snapshot-{mc_version}.zip"
         extract_dir = self.mappings_dir / f"mcp-{mc_version}"
         
         # Check if already downloaded
@@ -296,37 +646,34 @@ class MappingsDownloader:
             return extract_dir / "joined.srg"
         
         try:
-            response = requests.get(url, timeout=60, stream=True)
+            response = self.session.get(url, timeout=60, stream=True)
             if response.status_code == 200:
-                with open(zip_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                # Extract ZIP
-                with zipfile.ZipFile(zip_path, 'r') as z:
-                    z.extractall(extract_dir)
+                # The zip is only needed until the SRG is out, so keep it off the mappings dir
+                import tempfile
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as zip_buffer:
+                    _copy_response(response, zip_buffer)
+                    
+                    # Extract only the SRG file we need; the rest of the snapshot is never used
+                    with zipfile.ZipFile(zip_buffer, 'r') as z:
+                        names = [n for n in z.namelist() if n.endswith('.srg')]
+                        target = next((n for n in names if n.endswith('joined.srg')), None) or next(iter(names), None)
+                        if target:
+                            extract_dir.mkdir(parents=True, exist_ok=True)
+                            srg_file = extract_dir / Path(target).name
+                            with z.open(target) as src, open(srg_file, 'wb') as dst:
+                                shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
                 
-                # Find joined.srg
-                srg_file = extract_dir / "joined.srg"
-                if srg_file.exists():
-                    print(f"✓ MCP mappings for {mc_version} downloaded successfully")
-                    zip_path.unlink()  # Clean up ZIP
+                if target:
+                    if srg_file.name == "joined.srg":
+                        print(f"✓ MCP mappings for {mc_version} downloaded successfully")
+                    else:
+                        print(f"✓ MCP mappings for {mc_version} downloaded (using {srg_file.name})")
                     return srg_file
-                else:
-                    # Look for any .srg file
-                    srg_files = list(extract_dir.rglob("*.srg"))
-                    if srg_files:
-                        print(f"✓ MCP mappings for {mc_version} downloaded (using {srg_files[0].name})")
-                        zip_path.unlink()
-                        return srg_files[0]
             else:
                 print(f"⚠ MCPBot returned status {response.status_code} for version {mc_version}")
         except Exception as e:
             print(f"⚠ Failed to download MCP mappings: {e}")
         
-        if zip_path.exists():
-            zip_path.unlink()
-        
         return None
     
     def download_forge_mappings(self, mc_version: str) -> Optional[Path]:
@@ -362,6 +709,16 @@ class MappingsDownloader:
         return None
 
 
+@functools.lru_cache(maxsize=8)
+def get_cached_mappings(mc_version: str) -> Optional[Path]:
+    """
+    Get mappings for a Minecraft version with the default MappingsDownloader,
+    resolving each version (including a failed lookup) only once per process.
+    """
+    with MappingsDownloader() as downloader:
+        return downloader.get_mappings(mc_version)
+
+
 def main():
     """CLI for tool manager."""
     import argparse
@@ -379,21 +736,20 @@ def main():
     args = parser.parse_args()
     
     if args.install_tools or args.install_cfr or args.install_jd_cli or args.install_specialsource:
-        manager = ToolManager(args.tools_dir)
-        
-        if args.install_tools:
-            manager.ensure_all_tools(force=args.force)
-        else:
-            if args.install_cfr:
-                manager.install_cfr(force=args.force)
-            if args.install_jd_cli:
-                manager.install_jd_cli(force=args.force)
-            if args.install_specialsource:
-                manager.install_specialsource(force=args.force)
+        with ToolManager(args.tools_dir) as manager:
+            if args.install_tools:
+                manager.ensure_all_tools(force=args.force)
+            else:
+                if args.install_cfr:
+                    manager.install_cfr(force=args.force)
+                if args.install_jd_cli:
+                    manager.install_jd_cli(force=args.force)
+                if args.install_specialsource:
+                    manager.install_specialsource(force=args.force)
     
     if args.download_mappings:
-        downloader = MappingsDownloader(args.mappings_dir)
-        mappings = downloader.get_mappings(args.download_mappings)
+        with MappingsDownloader(args.mappings_dir) as downloader:
+            mappings = downloader.get_mappings(args.download_mappings)
         if mappings:
             print(f"✓ Mappings available at: {mappings}")
         else:
@@ -4,11 +4,92 @@ Vulture - Version Detector
 Detects Minecraft version from mod JAR files
 """
 
+import atexit
+import functools
+import os
 import zipfile
 import json
 import re
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Dict, FrozenSet, Optional, List, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Detection results persisted across runs (keyed by JAR path, mtime and size), relative to the home directory
+DETECT_CACHE_PATH = Path(".cache") / "vulture" / "version_detect.json"
+DETECT_CACHE_VERSION = 3
+
+# In-memory view of the detection cache file, loaded on first use and written back at exit
+_detect_cache: Optional[Dict[str, Optional[str]]] = None
+_detect_cache_dirty = False
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON with orjson when available, falling back to json for what it rejects (e.g. a BOM)."""
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_cache_file() -> Optional[Path]:
+    """Detection cache file location, or None if there is no home directory (e.g. an arbitrary container UID)."""
+    try:
+        return Path.home() / DETECT_CACHE_PATH
+    except (RuntimeError, KeyError):
+        return None
+
+
+def _get_detect_cache() -> Dict[str, Optional[str]]:
+    """Cached detection results, loading the cache file on first use (in memory only without one)."""
+    global _detect_cache
+    if _detect_cache is None:
+        _detect_cache = {}
+        cache_file = _detect_cache_file()
+        if cache_file is not None:
+            try:
+                cached = _json_loads(cache_file.read_bytes())
+                if cached.get('version') == DETECT_CACHE_VERSION:
+                    _detect_cache = cached['results']
+            except (OSError, ValueError, AttributeError, KeyError):
+                pass
+            atexit.register(_save_detect_cache)
+    return _detect_cache
+
+
+def _save_detect_cache():
+    """Write new detection results back to the cache file (skipped if it cannot be written)."""
+    global _detect_cache_dirty
+    cache_file = _detect_cache_file()
+    if not _detect_cache_dirty or cache_file is None:
+        return
+    cached = {'version': DETECT_CACHE_VERSION, 'results': _detect_cache}
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_file.with_suffix('.tmp')
+        if orjson:
+            tmp_path.write_bytes(orjson.dumps(cached))
+        else:
+            tmp_path.write_text(json.dumps(cached, separators=(',', ':')))
+        os.replace(tmp_path, cache_file)
+        _detect_cache_dirty = False
+    except OSError:
+        pass
+
+
+def _latest_by_major_minor(versions: List[str]) -> Dict[str, str]:
+    """Map each "major.minor" to the highest listed version sharing it."""
+    latest: Dict[str, str] = {}
+    for version in sorted(versions, key=lambda v: tuple(int(part) for part in v.split('.'))):
+        latest['.'.join(version.split('.')[:2])] = version
+    return latest
 
 
 class VersionDetector:
@@ -21,6 +102,16 @@ class VersionDetector:
         r'(\d+\.\d+\.\d+)',  # Full version
     ]
     
+    # VERSION_PATTERNS folded into one compiled pattern; the first match of the
+    # standard format is always the one the list would have picked
+    VERSION_RE = re.compile(r'(?:mc)?(\d+\.\d+(?:\.\d+)?)', re.IGNORECASE)
+    # Same pattern for raw file contents read from the JAR, so they need no decoding
+    VERSION_BYTES_RE = re.compile(rb'(?:mc)?(\d+\.\d+(?:\.\d+)?)', re.IGNORECASE)
+    
+    # Optional "mc" prefix and the shape of a plain version string
+    MC_PREFIX_RE = re.compile(r'^mc', re.IGNORECASE)
+    VALID_VERSION_RE = re.compile(r'^\d+\.\d+(?:\.\d+)?$')
+    
     # Known Minecraft versions (for validation)
     KNOWN_VERSIONS = [
         "1.7.10", "1.8", "1.8.9", "1.9", "1.9.4", "1.10", "1.10.2",
@@ -31,60 +122,106 @@ class VersionDetector:
         "1.21", "1.21.1"
     ]
     
+    # Known versions for O(1) lookup: exact strings, and the latest known patch per major.minor
+    KNOWN_VERSION_SET = frozenset(KNOWN_VERSIONS)
+    KNOWN_BY_MAJOR_MINOR = _latest_by_major_minor(KNOWN_VERSIONS)
+    
+    # Canonical manifest location inside a JAR
+    MANIFEST_PATH = 'META-INF/MANIFEST.MF'
+    
+    # Version-specific packages (package -> rough version hint)
+    VERSION_INDICATORS = {
+        'net.minecraft.client': '1.8+',
+        'net.minecraftforge': '1.7.10+',
+    }
+    
+    # VERSION_INDICATORS as package directory prefixes of JAR entry names
+    VERSION_INDICATOR_PATHS = tuple(k.replace('.', '/') + '/' for k in VERSION_INDICATORS)
+    
     def __init__(self, jar_path: str):
         self.jar_path = Path(jar_path)
-        if not self.jar_path.exists():
-            raise FileNotFoundError(f"JAR file not found: {jar_path}")
+        try:
+            st = self.jar_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"JAR file not found: {jar_path}") from None
+        self._cache_key = f"{self.jar_path.resolve()}|{st.st_mtime_ns}|{st.st_size}"
         
-        self.jar = zipfile.ZipFile(self.jar_path, 'r')
+        self._jar: Optional[zipfile.ZipFile] = None
+        # A JAR with a cached result is only opened if a detect_from_* method needs it
+        if self._cache_key not in _get_detect_cache():
+            self._open_jar()
+    
+    def _open_jar(self) -> zipfile.ZipFile:
+        """Open the JAR (reads its central directory)."""
+        self._jar = zipfile.ZipFile(self.jar_path, 'r')
+        return self._jar
+    
+    @property
+    def jar(self) -> zipfile.ZipFile:
+        """The opened JAR file."""
+        return self._jar if self._jar is not None else self._open_jar()
+    
+    @functools.cached_property
+    def _names(self) -> Tuple[str, ...]:
+        """Entry names, read once, for ordered scans."""
+        return tuple(self.jar.namelist())
+    
+    @functools.cached_property
+    def _name_set(self) -> FrozenSet[str]:
+        """Entry names for membership tests."""
+        return frozenset(self._names)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def detect_from_filename(self) -> Optional[str]:
         """Try to detect version from JAR filename."""
         filename = self.jar_path.stem.lower()
         
         # Look for version patterns in filename
-        for pattern in self.VERSION_PATTERNS:
-            match = re.search(pattern, filename)
-            if match:
-                version = match.group(1)
-                # Normalize version (e.g., "1.8" -> "1.8.9" if close match)
-                normalized = self._normalize_version(version)
-                if normalized:
-                    return normalized
+        match = self.VERSION_RE.search(filename)
+        if match:
+            version = match.group(1)
+            # Normalize version (e.g., "1.8" -> "1.8.9" if close match)
+            normalized = self._normalize_version(version)
+            if normalized:
+                return normalized
         
         return None
     
     def detect_from_mcmod_info(self) -> Optional[str]:
         """Detect version from mcmod.info file."""
-        if 'mcmod.info' not in self.jar.namelist():
+        if 'mcmod.info' not in self._name_set:
             return None
         
         try:
-            info_content = self.jar.read('mcmod.info').decode('utf-8')
+            info_content = self.jar.read('mcmod.info')
             
-            # Try to parse as JSON
-            try:
-                mod_info = json.loads(info_content)
-                if isinstance(mod_info, list) and len(mod_info) > 0:
-                    mod_info = mod_info[0]
-                
-                # Check for mcversion field
-                if 'mcversion' in mod_info:
-                    version = str(mod_info['mcversion'])
-                    normalized = self._normalize_version(version)
-                    if normalized:
-                        return normalized
-            except:
-                pass
+            # Try to parse as JSON (only worth it if the field is there at all)
+            if b'mcversion' in info_content:
+                try:
+                    mod_info = _json_loads(info_content)
+                    if isinstance(mod_info, list) and len(mod_info) > 0:
+                        mod_info = mod_info[0]
+                    
+                    # Check for mcversion field
+                    if 'mcversion' in mod_info:
+                        version = str(mod_info['mcversion'])
+                        normalized = self._normalize_version(version)
+                        if normalized:
+                            return normalized
+                except:
+                    pass
             
             # Try regex search in raw content
-            for pattern in self.VERSION_PATTERNS:
-                match = re.search(pattern, info_content)
-                if match:
-                    version = match.group(1)
-                    normalized = self._normalize_version(version)
-                    if normalized:
-                        return normalized
+            match = self.VERSION_BYTES_RE.search(info_content)
+            if match:
+                normalized = self._normalize_version(match.group(1).decode('ascii'))
+                if normalized:
+                    return normalized
         except:
             pass
         
@@ -92,51 +229,40 @@ class VersionDetector:
     
     def detect_from_manifest(self) -> Optional[str]:
         """Detect version from MANIFEST.MF."""
-        manifest_paths = [
-            'META-INF/MANIFEST.MF',
-            'META-INF/maven/**/pom.properties',
-        ]
+        # The canonical manifest first, then any other manifests and META-INF/maven/**/pom.properties
+        candidates = []
+        if self.MANIFEST_PATH in self._name_set:
+            candidates.append(self.MANIFEST_PATH)
+        candidates.extend(
+            name for name in self._names
+            if name != self.MANIFEST_PATH and ('MANIFEST.MF' in name or 'pom.properties' in name)
+        )
         
-        for path_pattern in manifest_paths:
-            for file_path in self.jar.namelist():
-                if 'MANIFEST.MF' in file_path or 'pom.properties' in file_path:
-                    try:
-                        content = self.jar.read(file_path).decode('utf-8', errors='ignore')
-                        for pattern in self.VERSION_PATTERNS:
-                            match = re.search(pattern, content)
-                            if match:
-                                version = match.group(1)
-                                normalized = self._normalize_version(version)
-                                if normalized:
-                                    return normalized
-                    except:
-                        continue
+        for file_path in candidates:
+            try:
+                match = self.VERSION_BYTES_RE.search(self.jar.read(file_path))
+            except Exception:
+                continue
+            if match:
+                normalized = self._normalize_version(match.group(1).decode('ascii'))
+                if normalized:
+                    return normalized
         
         return None
     
     def detect_from_class_files(self) -> Optional[str]:
         """Try to detect version from class file names/packages."""
-        # Look for version-specific packages
-        version_indicators = {
-            'net.minecraft.client': '1.8+',
-            'net.minecraftforge': '1.7.10+',
-        }
-        
-        class_files = [f for f in self.jar.namelist() if f.endswith('.class')]
-        
-        # Check package structure for version hints
-        for class_file in class_files[:100]:  # Check first 100 classes
-            for indicator, version_hint in version_indicators.items():
-                if indicator.replace('.', '/') in class_file:
-                    # This is a rough indicator, return a common version
-                    return "1.8.9"  # Default fallback
+        # Any entry under a version-specific package; stops at the first hit
+        if any(name.startswith(self.VERSION_INDICATOR_PATHS) for name in self._names):
+            # This is a rough indicator, return a common version
+            return "1.8.9"  # Default fallback
         
         return None
     
     def _normalize_version(self, version: str) -> Optional[str]:
         """Normalize version string to standard format."""
         # Remove 'mc' prefix if present
-        version = re.sub(r'^mc', '', version, flags=re.IGNORECASE)
+        version = self.MC_PREFIX_RE.sub('', version)
         
         # Ensure we have at least major.minor
         parts = version.split('.')
@@ -144,28 +270,34 @@ class VersionDetector:
             return None
         
         # Try to match to known versions
-        major_minor = f"{parts[0]}.{parts[1]}"
-        
-        # Find closest match in known versions
-        for known_version in self.KNOWN_VERSIONS:
-            if known_version.startswith(major_minor):
-                return known_version
+        if version in self.KNOWN_VERSION_SET:
+            return version
         
-        # If no exact match, return normalized version
-        if len(parts) == 2:
-            # Try to find a common patch version
-            for known_version in self.KNOWN_VERSIONS:
-                if known_version.startswith(major_minor):
-                    return known_version
+        # Otherwise use the latest known patch of the same major.minor
+        known_version = self.KNOWN_BY_MAJOR_MINOR.get(f"{parts[0]}.{parts[1]}")
+        if known_version:
+            return known_version
         
         # Return as-is if it looks valid
-        if re.match(r'^\d+\.\d+(?:\.\d+)?$', version):
+        if self.VALID_VERSION_RE.match(version):
             return version
         
         return None
     
     def detect(self) -> Optional[str]:
-        """Detect Minecraft version using all available methods."""
+        """Detect Minecraft version using all available methods (cached per JAR across runs)."""
+        global _detect_cache_dirty
+        cache = _get_detect_cache()
+        if self._cache_key in cache:
+            return cache[self._cache_key]
+        
+        version = self._detect_uncached()
+        cache[self._cache_key] = version
+        _detect_cache_dirty = True
+        return version
+    
+    def _detect_uncached(self) -> Optional[str]:
+        """Run the detection methods in order, returning the first version found."""
         methods = [
             self.detect_from_mcmod_info,
             self.detect_from_filename,
@@ -185,7 +317,9 @@ class VersionDetector:
     
     def close(self):
         """Close the JAR file."""
-        self.jar.close()
+        if self._jar is not None:
+            self._jar.close()
+            self._jar = None
 
 
 def main():
@@ -199,9 +333,8 @@ def main():
     jar_path = sys.argv[1]
     
     try:
-        detector = VersionDetector(jar_path)
-        version = detector.detect()
-        detector.close()
+        with VersionDetector(jar_path) as detector:
+            version = detector.detect()
         
         if version:
             print(f"Detected Minecraft version: {version}")